@@ -0,0 +1,171 @@
+"""
+Benchmark of the favourite genre computations on synthetic data.
+
+Compares, for one heavy user and for a batch of users:
+- legacy: the original implementation (prefetch, list of lists, chain, full sort).
+- python: TopFavouriteGenres.top_favourite_genres_from_user_movie_collection.
+- database: TopFavouriteGenres.top_favourite_genres_from_database (GROUP BY + heap).
+- batch: TopFavouriteGenres.top_favourite_genres_for_users (one query for all users).
+- histogram: GenreHistogram.top_favourite_genres (maintained counts, indexed read).
+
+Runs against a throw-away in-memory SQLite database:
+
+    python benchmarks/favourite_genres.py --users 50 --collections 20 --movies 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from collections import Counter
+from itertools import chain, islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+# never open the project database (or a replica), not even to create the test one.
+settings.DATABASES = {
+    "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}
+}
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Prefetch  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from movies.models import Collection, Genre, Movies  # noqa: E402
+from utility.genre_histogram import GenreHistogram  # noqa: E402
+from utility.movie_helper import TopFavouriteGenres  # noqa: E402
+
+GENRES = [
+    "Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary", "Drama",
+    "Family", "Fantasy", "History", "Horror", "Music", "Mystery", "Romance",
+    "Science Fiction", "Thriller", "War", "Western",
+]  # fmt: skip
+
+
+def legacy_top_favourite_genres(collections, n=3):
+    user_collections = collections.prefetch_related(
+        Prefetch(
+            "movies",
+            queryset=Movies.objects.only("genres"),
+            to_attr="movies_with_genres",
+        )
+    )
+    genres_list = []
+    for collection in user_collections:
+        for movie in collection.movies_with_genres:
+            genres_list.append(movie.genres.split(","))
+    genres_list = list(chain(*genres_list))
+    _dict = Counter(genres_list)
+    sorted_dict = dict(sorted(_dict.items(), key=lambda x: x[1], reverse=True))
+    return ",".join(islice(sorted_dict.keys(), n))
+
+
+def populate(users, collections, movies, catalog):
+    rng = random.Random(0)
+    Movies.objects.bulk_create(
+        [
+            Movies(
+                title="movie %d" % i,
+                description="description",
+                genres=",".join(rng.sample(GENRES, rng.randint(1, 4))),
+            )
+            for i in range(catalog)
+        ]
+    )
+    movie_ids = list(Movies.objects.values_list("id", flat=True))
+    Genre.objects.sync_movies(movie_ids)
+
+    User.objects.bulk_create([User(username="user%d" % i) for i in range(users)])
+    Collection.objects.bulk_create(
+        [
+            Collection(title="c", description="d", user=user)
+            for user in User.objects.all()
+            for _ in range(collections)
+        ]
+    )
+    through = Collection.movies.through
+    through.objects.bulk_create(
+        [
+            through(collection_id=collection_id, movies_id=movie_id)
+            for collection_id in Collection.objects.values_list("id", flat=True)
+            for movie_id in rng.sample(movie_ids, movies)
+        ],
+        batch_size=5000,
+    )
+    GenreHistogram.rebuild()
+
+
+def measure(label, func, repeat):
+    seconds = min(timeit.repeat(func, number=1, repeat=repeat))
+    print("%-28s %10.2f ms" % (label, seconds * 1000))
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--collections", type=int, default=20)
+    parser.add_argument("--movies", type=int, default=200, help="per collection")
+    parser.add_argument("--catalog", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0)
+    populate(args.users, args.collections, args.movies, args.catalog)
+
+    helper = TopFavouriteGenres()
+    user = User.objects.first()
+    collections = Collection.objects.filter(user=user)
+    user_ids = list(User.objects.values_list("id", flat=True))
+    print(
+        "%d users x %d collections x %d movies"
+        % (args.users, args.collections, args.movies)
+    )
+
+    print("\none user")
+    measure("legacy", lambda: legacy_top_favourite_genres(collections), args.repeat)
+    measure(
+        "python",
+        lambda: helper.top_favourite_genres_from_user_movie_collection(collections),
+        args.repeat,
+    )
+    measure(
+        "database",
+        lambda: helper.top_favourite_genres_from_database(collections),
+        args.repeat,
+    )
+    measure(
+        "histogram",
+        lambda: GenreHistogram.top_favourite_genres(user),
+        args.repeat,
+    )
+
+    print("\nall users")
+    measure(
+        "legacy, one user at a time",
+        lambda: [
+            legacy_top_favourite_genres(Collection.objects.filter(user_id=user_id))
+            for user_id in user_ids
+        ],
+        args.repeat,
+    )
+    measure(
+        "batch",
+        lambda: helper.top_favourite_genres_for_users(user_ids),
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    with override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    ):
+        main()
@@ -47,6 +47,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "movies.middleware.MetricsMiddleware",
+    "movies.middleware.ReadYourWritesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "movies.middleware.RequestCounterMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -87,6 +89,23 @@ DATABASES = {
     }
 }
 
+# Optional read replica, reads of the movies app go to it (see utility.db_router). Tests
+# use the test primary database for it.
+DATABASE_REPLICA_NAME = config("DATABASE_REPLICA_NAME", default="")
+if DATABASE_REPLICA_NAME:
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / DATABASE_REPLICA_NAME,
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["utility.db_router.PrimaryReplicaRouter"]
+
+# Seconds a user's reads stay on the primary database after one of their writes.
+DATABASE_REPLICA_PIN_SECONDS = config(
+    "DATABASE_REPLICA_PIN_SECONDS", default=5, cast=int
+)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -137,7 +156,7 @@ REST_FRAMEWORK = {
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "movies.authentication.CachedUserJWTAuthentication",
     ),
 }
 
@@ -161,3 +180,108 @@ CACHES = {
 }
 
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
+
+# Third party movie api
+# A single pooled session is shared by all threads of a worker process, see
+# utility.retry_mechanism.RetryStrategy.
+
+MOVIE_API_POOL_CONNECTIONS = config("MOVIE_API_POOL_CONNECTIONS", default=4, cast=int)
+MOVIE_API_POOL_MAXSIZE = config("MOVIE_API_POOL_MAXSIZE", default=20, cast=int)
+MOVIE_API_CONNECT_TIMEOUT = config(
+    "MOVIE_API_CONNECT_TIMEOUT", default=3.05, cast=float
+)
+MOVIE_API_READ_TIMEOUT = config("MOVIE_API_READ_TIMEOUT", default=10, cast=float)
+MOVIE_API_RETRY_TOTAL = config("MOVIE_API_RETRY_TOTAL", default=4, cast=int)
+MOVIE_API_RETRY_BACKOFF = config("MOVIE_API_RETRY_BACKOFF", default=2, cast=float)
+
+# Cache for movie api pages, see utility.movie_catalog.MovieCatalog.
+# Pages are fresh for MOVIE_API_CACHE_TTL seconds and then served stale for up to
+# MOVIE_API_CACHE_STALE_TTL seconds while a background refresh runs.
+MOVIE_API_CACHE_TTL = config("MOVIE_API_CACHE_TTL", default=300, cast=int)
+MOVIE_API_CACHE_STALE_TTL = config("MOVIE_API_CACHE_STALE_TTL", default=86400, cast=int)
+MOVIE_API_CACHE_REFRESH_TIMEOUT = config(
+    "MOVIE_API_CACHE_REFRESH_TIMEOUT", default=60, cast=int
+)
+
+# Concurrent fetches of the same movie api page are coalesced: one caller holds a lease
+# for up to MOVIE_API_COALESCE_LEASE seconds, the others wait up to
+# MOVIE_API_COALESCE_WAIT seconds for the result it publishes. The lease is extended to
+# the worst case fetch (retries, timeouts and backoff) when that takes longer.
+MOVIE_API_COALESCE_LEASE = config("MOVIE_API_COALESCE_LEASE", default=60, cast=int)
+MOVIE_API_COALESCE_WAIT = config("MOVIE_API_COALESCE_WAIT", default=10, cast=float)
+MOVIE_API_COALESCE_RESULT_TTL = config(
+    "MOVIE_API_COALESCE_RESULT_TTL", default=5, cast=int
+)
+
+# Circuit breaker for the movie api, see utility.circuit_breaker.CircuitBreaker.
+MOVIE_API_BREAKER_ENABLED = config("MOVIE_API_BREAKER_ENABLED", default=True, cast=bool)
+MOVIE_API_BREAKER_FAILURE_THRESHOLD = config(
+    "MOVIE_API_BREAKER_FAILURE_THRESHOLD", default=5, cast=int
+)
+MOVIE_API_BREAKER_FAILURE_WINDOW = config(
+    "MOVIE_API_BREAKER_FAILURE_WINDOW", default=60, cast=int
+)
+MOVIE_API_BREAKER_COOLDOWN = config("MOVIE_API_BREAKER_COOLDOWN", default=30, cast=int)
+
+# Where /movies/ is served from:
+# - upstream: the movie api, through the page cache above.
+# - mirror: the Movies table, filled by `python manage.py sync_movies`.
+# - stream: the movie api, relaying its body unparsed in chunks of
+#   MOVIE_API_STREAM_CHUNK_SIZE bytes.
+MOVIE_LIST_SOURCE = config("MOVIE_LIST_SOURCE", default="upstream")
+MOVIE_SYNC_BATCH_SIZE = config("MOVIE_SYNC_BATCH_SIZE", default=500, cast=int)
+MOVIE_MIRROR_PAGE_SIZE = config("MOVIE_MIRROR_PAGE_SIZE", default=10, cast=int)
+MOVIE_API_STREAM_CHUNK_SIZE = config(
+    "MOVIE_API_STREAM_CHUNK_SIZE", default=65536, cast=int
+)
+
+# Default page size of the cursor paginated collection list and collection movies.
+COLLECTION_PAGE_SIZE = config("COLLECTION_PAGE_SIZE", default=100, cast=int)
+
+# Maximum number of collections read at once through collection/batch/.
+COLLECTION_BATCH_MAX_SIZE = config("COLLECTION_BATCH_MAX_SIZE", default=50, cast=int)
+
+# Collections imported per transaction by collection/import/, and read per query by
+# collection/export/.
+COLLECTION_IMPORT_CHUNK_SIZE = config(
+    "COLLECTION_IMPORT_CHUNK_SIZE", default=100, cast=int
+)
+COLLECTION_EXPORT_CHUNK_SIZE = config(
+    "COLLECTION_EXPORT_CHUNK_SIZE", default=500, cast=int
+)
+
+# Seconds a cached collection response is kept, see utility.response_cache.ResponseCache.
+# Entries are invalidated on writes, this only bounds how long unreachable ones linger.
+RESPONSE_CACHE_TTL = config("RESPONSE_CACHE_TTL", default=600, cast=int)
+
+# RequestCounterMiddleware buffers counts in each process and flushes them to redis every
+# REQUEST_COUNTER_FLUSH_EVERY requests or after REQUEST_COUNTER_FLUSH_INTERVAL seconds.
+REQUEST_COUNTER_FLUSH_EVERY = config(
+    "REQUEST_COUNTER_FLUSH_EVERY", default=100, cast=int
+)
+REQUEST_COUNTER_FLUSH_INTERVAL = config(
+    "REQUEST_COUNTER_FLUSH_INTERVAL", default=5, cast=float
+)
+
+# Metrics (see utility.metrics) are buffered in each process and flushed to redis every
+# METRICS_FLUSH_EVERY observations or after METRICS_FLUSH_INTERVAL seconds.
+METRICS_FLUSH_EVERY = config("METRICS_FLUSH_EVERY", default=500, cast=int)
+METRICS_FLUSH_INTERVAL = config("METRICS_FLUSH_INTERVAL", default=5, cast=float)
+
+# Token bucket throttles of the movie list (see movies.throttling), per user and for all
+# users together: sustained rate in the "<requests>/<s|m|h|d>" format and burst size.
+# An empty rate disables the throttle.
+MOVIE_LIST_USER_THROTTLE_RATE = config("MOVIE_LIST_USER_THROTTLE_RATE", default="60/m")
+MOVIE_LIST_USER_THROTTLE_BURST = config(
+    "MOVIE_LIST_USER_THROTTLE_BURST", default=10, cast=int
+)
+MOVIE_LIST_GLOBAL_THROTTLE_RATE = config(
+    "MOVIE_LIST_GLOBAL_THROTTLE_RATE", default="600/m"
+)
+MOVIE_LIST_GLOBAL_THROTTLE_BURST = config(
+    "MOVIE_LIST_GLOBAL_THROTTLE_BURST", default=100, cast=int
+)
+
+# Seconds an authenticated user is cached by the JWT authentication of the api (see
+# movies.authentication), entries are dropped when the user is saved or deleted.
+AUTH_USER_CACHE_TTL = config("AUTH_USER_CACHE_TTL", default=60, cast=int)
@@ -1,6 +1,13 @@
 import pytest
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from fakeredis import FakeConnection
 from pytest_factoryboy import register
+from rest_framework.test import APIClient
 from tests.factories import UserFactory, MovieFactory, CollectionFactory
+from utility.metrics import metrics
+from utility.request_counter import request_counter
+from utility.request_rates import request_rates
 
 
 register(UserFactory)
@@ -13,5 +20,40 @@ def user_create(db, user_factory):
     return user
 
 
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    # tests run without a redis server, use a per-process in-memory cache instead.
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+    request_counter.reset()
+    request_rates.clear()
+    metrics.reset()
+    yield
+    request_counter.reset()
+    request_rates.clear()
+    metrics.reset()
+    cache.clear()
 
 
+@pytest.fixture
+def redis_cache(settings):
+    # django_redis on an in-process fake redis server (with Lua), to run the redis paths.
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": "redis://127.0.0.1:6379/1",
+            "OPTIONS": {"CONNECTION_POOL_KWARGS": {"connection_class": FakeConnection}},
+        }
+    }
+    get_redis_connection("default").flushdb()
+    yield
+    get_redis_connection("default").flushdb()
+
+
+@pytest.fixture
+def api_client(user_create):
+    client = APIClient()
+    client.force_authenticate(user=user_create)
+    return client
@@ -1,7 +1,9 @@
 from django.contrib import admin
-from .models import Movies, Collection
+from .models import Movies, Collection, CatalogSyncCheckpoint, Genre
 
 # Register your models here.
 
 admin.site.register(Movies)
 admin.site.register(Collection)
+admin.site.register(CatalogSyncCheckpoint)
+admin.site.register(Genre)
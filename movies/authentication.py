@@ -0,0 +1,43 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from utility.db_router import ReadYourWrites
+from utility.user_cache import UserCache
+
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication resolving the user from the token's user id claim and UserCache,
+    instead of fetching the user row from the database on every request.
+
+    Inactive and deleted users are refused like with JWTAuthentication once their cache
+    entry is invalidated (on save and delete) or expired (AUTH_USER_CACHE_TTL).
+
+    Requests of a user who wrote recently read from the primary database, see
+    utility.db_router.
+    """
+
+    def get_user(self, validated_token):
+        user = self.get_cached_user(validated_token)
+        # read the user's own recent writes from the primary database.
+        ReadYourWrites.pin_user(user.pk)
+        return user
+
+    def get_cached_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != "id":
+            # the revoke claim is checked against the password hash, which is not cached,
+            # and users are cached by primary key.
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = UserCache.get(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
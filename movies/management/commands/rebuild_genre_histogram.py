@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from utility.genre_histogram import GenreHistogram
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-user genre counts used for favourite genres."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Only rebuild this user id, can be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuilt = GenreHistogram.rebuild(user_ids=options["user_ids"])
+        self.stdout.write(
+            self.style.SUCCESS("Rebuilt genre counts of %d users." % rebuilt)
+        )
@@ -0,0 +1,44 @@
+import requests
+from decouple import config
+from django.core.management.base import BaseCommand, CommandError
+from utility.catalog_sync import CatalogSync
+from utility.circuit_breaker import CircuitOpenError
+
+
+class Command(BaseCommand):
+    help = "Mirror the third-party movie catalog into the Movies table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Start from the first page instead of the last checkpoint.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Number of movies upserted per query.",
+        )
+
+    def handle(self, *args, **options):
+        sync = CatalogSync(
+            config("MOVIE_API_URL"),
+            username=config("API_CLIENT"),
+            password=config("API_CLIENT_SECRET"),
+            verify=False,
+            batch_size=options["batch_size"],
+        )
+        try:
+            checkpoint = sync.run(full=options["full"])
+        except (requests.exceptions.RequestException, CircuitOpenError) as exc:
+            raise CommandError(
+                "Sync stopped, rerun to resume from the checkpoint: %s" % exc
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Synced %d pages, %d movies."
+                % (checkpoint.pages_synced, checkpoint.movies_synced)
+            )
+        )
@@ -1,17 +1,87 @@
-from django.core.cache import cache
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+from utility.db_router import ReadYourWrites
+from utility.metrics import QueryRecorder, metrics
+from utility.request_counter import request_counter
+from utility.request_rates import request_rates
 
 
 class RequestCounterMiddleware:
+    """
+    Counts requests by route name and status class, see utility.request_counter, and
+    records them with their user in the sliding windows of utility.request_rates.
+
+    Counts are buffered in the process and flushed to redis in batches, so no request
+    waits on a round-trip to redis. Static files are not counted.
+    """
+
     def __init__(self, get_response):
         self.get_response = get_response
         # One-time configuration and initialization.
 
     def __call__(self, request):
 
-        # increment request_count for each requests.
-        request_count = cache.incr("request_count", 1)
-        request.request_count = request_count
+        response = self.get_response(request)
+
+        if not (settings.STATIC_URL and request.path.startswith(settings.STATIC_URL)):
+            match = request.resolver_match
+            route = match.view_name if match else "unmatched"
+            request_counter.record(route, response.status_code)
+            # the user is known once the view authenticated the request.
+            user = getattr(request, "user", None)
+            request_rates.record(user.id if user is not None else None)
+
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Records the latency of every request and the number of database queries it ran, and
+    the time spent in them, by view name. See utility.metrics for the /metrics/ endpoint.
+
+    The body of a streamed response is produced after this middleware returns, its time
+    and queries are not included.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        metrics.observe("http_request_duration_seconds", duration, view=view)
+        metrics.observe("http_request_db_queries", recorder.count, view=view)
+        metrics.observe(
+            "http_request_db_duration_seconds", recorder.duration, view=view
+        )
+
+        return response
+
+
+class ReadYourWritesMiddleware:
+    """
+    Resets the database routing state of utility.db_router for every request, and pins
+    the user's next reads to the primary database when the request wrote.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        ReadYourWrites.start()
 
         response = self.get_response(request)
 
+        user = getattr(request, "user", None)
+        ReadYourWrites.finish(user.id if user is not None else None)
         return response
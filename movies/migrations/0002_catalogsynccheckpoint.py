@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CatalogSyncCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("next_url", models.URLField(blank=True, max_length=2000)),
+                ("completed", models.BooleanField(default=False)),
+                ("pages_synced", models.PositiveIntegerField(default=0)),
+                ("movies_synced", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:18
+
+import django.db.models.deletion
+from collections import Counter
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_genre_counts(apps, schema_editor):
+    Collection = apps.get_model("movies", "Collection")
+    UserGenreCount = apps.get_model("movies", "UserGenreCount")
+
+    histograms = {}
+    memberships = Collection.movies.through.objects.values_list(
+        "collection__user_id", "movies__genres"
+    )
+    for user_id, genres in memberships.iterator():
+        histograms.setdefault(user_id, Counter()).update(
+            genre for genre in genres.split(",") if genre
+        )
+    UserGenreCount.objects.bulk_create(
+        [
+            UserGenreCount(user_id=user_id, genre=genre, count=count)
+            for user_id, histogram in histograms.items()
+            for genre, count in histogram.items()
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0002_catalogsynccheckpoint"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserGenreCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("genre", models.CharField(max_length=225)),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="genre_counts",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["user", "-count"], name="user_genre_count_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="usergenrecount",
+            constraint=models.UniqueConstraint(
+                fields=("user", "genre"), name="unique_user_genre"
+            ),
+        ),
+        migrations.RunPython(backfill_genre_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_genres(apps, schema_editor):
+    Genre = apps.get_model("movies", "Genre")
+    Movies = apps.get_model("movies", "Movies")
+    MovieGenre = apps.get_model("movies", "MovieGenre")
+
+    genre_ids = {}
+    batch = []
+    for movie_id, genres in Movies.objects.values_list("id", "genres").iterator():
+        for name in {name.strip() for name in genres.split(",") if name.strip()}:
+            if name not in genre_ids:
+                genre_ids[name] = Genre.objects.create(name=name).id
+            batch.append(MovieGenre(movie_id=movie_id, genre_id=genre_ids[name]))
+        if len(batch) >= 1000:
+            MovieGenre.objects.bulk_create(batch)
+            batch = []
+    MovieGenre.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0003_usergenrecount"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Genre",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=225, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="MovieGenre",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "genre",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="movie_genres",
+                        to="movies.genre",
+                    ),
+                ),
+                (
+                    "movie",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="movie_genres",
+                        to="movies.movies",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="movies",
+            name="genre_tags",
+            field=models.ManyToManyField(
+                related_name="movies", through="movies.MovieGenre", to="movies.genre"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="moviegenre",
+            index=models.Index(fields=["genre", "movie"], name="genre_movie_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="moviegenre",
+            constraint=models.UniqueConstraint(
+                fields=("movie", "genre"), name="unique_movie_genre"
+            ),
+        ),
+        migrations.RunPython(populate_genres, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+from collections import Counter
+from django.db import migrations
+
+
+def rebuild_genre_counts(apps, schema_editor):
+    # 0003 counted genres without stripping them, recount with the names Genre uses.
+    Collection = apps.get_model("movies", "Collection")
+    UserGenreCount = apps.get_model("movies", "UserGenreCount")
+
+    histograms = {}
+    memberships = Collection.movies.through.objects.values_list(
+        "collection__user_id", "movies__genres"
+    )
+    for user_id, genres in memberships.iterator():
+        histograms.setdefault(user_id, Counter()).update(
+            genre.strip() for genre in genres.split(",") if genre.strip()
+        )
+    UserGenreCount.objects.all().delete()
+    UserGenreCount.objects.bulk_create(
+        [
+            UserGenreCount(user_id=user_id, genre=genre, count=count)
+            for user_id, histogram in histograms.items()
+            for genre, count in histogram.items()
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0005_collection_revision_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_genre_counts, migrations.RunPython.noop),
+    ]
@@ -5,16 +5,84 @@ from django.contrib.auth.models import User
 # Create your models here.
 
 
+class GenreManager(models.Manager):
+    def sync_movies(self, movie_ids):
+        """
+        Brings the MovieGenre rows of the given movies in line with their `genres` strings,
+        with a constant number of queries whatever the number of movies.
+        """
+        movie_genres = {
+            movie_id: set(Genre.split_names(genres))
+            for movie_id, genres in Movies.objects.filter(id__in=movie_ids).values_list(
+                "id", "genres"
+            )
+        }
+        if not movie_genres:
+            return
+
+        names = set().union(*movie_genres.values())
+        self.bulk_create([Genre(name=name) for name in names], ignore_conflicts=True)
+        genre_ids = dict(self.filter(name__in=names).values_list("name", "id"))
+
+        wanted = {
+            (movie_id, genre_ids[name])
+            for movie_id, genres in movie_genres.items()
+            for name in genres
+        }
+        existing = {
+            (movie_id, genre_id): pk
+            for pk, movie_id, genre_id in MovieGenre.objects.filter(
+                movie_id__in=movie_genres
+            ).values_list("id", "movie_id", "genre_id")
+        }
+        stale = [pk for key, pk in existing.items() if key not in wanted]
+        if stale:
+            MovieGenre.objects.filter(id__in=stale).delete()
+        MovieGenre.objects.bulk_create(
+            [
+                MovieGenre(movie_id=movie_id, genre_id=genre_id)
+                for movie_id, genre_id in wanted - set(existing)
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Genre(models.Model):
+
+    name = models.CharField(max_length=225, unique=True)
+
+    objects = GenreManager()
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def split_names(genres):
+        """Returns the genre names of a comma separated `Movies.genres` string."""
+        return [name for name in map(str.strip, (genres or "").split(",")) if name]
+
+
 class Movies(models.Model):
 
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     title = models.CharField(max_length=225)
     description = models.CharField(max_length=225)
     genres = models.CharField(max_length=225)
+    # normalized copy of `genres`, kept in sync by movies.signals and GenreManager.sync_movies
+    genre_tags = models.ManyToManyField(
+        Genre, through="MovieGenre", related_name="movies"
+    )
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the stored genres so a save can tell whether they changed.
+        instance._loaded_genres = instance.__dict__.get("genres")
+        return instance
+
 
 class Collection(models.Model):
 
@@ -23,6 +91,85 @@ class Collection(models.Model):
     description = models.CharField(max_length=225)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="collections")
     movies = models.ManyToManyField(Movies, related_name="collections")
+    # bumped on membership and movie changes by movies.signals, used for ETags.
+    revision = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        # revision is only raised in the database (CollectionVersion.bump), saving an
+        # instance loaded before a bump must not write the old value back.
+        if not self._state.adding and not args and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "revision"
+            ]
+        super().save(*args, **kwargs)
+
+
+class MovieGenre(models.Model):
+
+    movie = models.ForeignKey(
+        Movies, on_delete=models.CASCADE, related_name="movie_genres"
+    )
+    genre = models.ForeignKey(
+        Genre, on_delete=models.CASCADE, related_name="movie_genres"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["movie", "genre"], name="unique_movie_genre"
+            )
+        ]
+        # the unique constraint covers lookups by movie, this one covers lookups by genre.
+        indexes = [models.Index(fields=["genre", "movie"], name="genre_movie_idx")]
+
+    def __str__(self):
+        return "%s: %s" % (self.movie_id, self.genre_id)
+
+
+class UserGenreCount(models.Model):
+    """
+    How many times a genre appears across the movies of all collections of a user.
+
+    Kept up to date by the signal handlers in movies.signals, see GenreHistogram.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="genre_counts"
+    )
+    genre = models.CharField(max_length=225)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "genre"], name="unique_user_genre")
+        ]
+        indexes = [models.Index(fields=["user", "-count"], name="user_genre_count_idx")]
+
+    def __str__(self):
+        return "%s: %s" % (self.genre, self.count)
+
+
+class CatalogSyncCheckpoint(models.Model):
+    """
+    Progress of a sync of the third-party movie catalog into the Movies table.
+
+    `next_url` is the page the next run starts from. While a run is in progress it
+    points at the first page not yet stored, once a run completes it points back at the
+    last page so reruns only pick up movies appended since.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    next_url = models.URLField(max_length=2000, blank=True)
+    completed = models.BooleanField(default=False)
+    pages_synced = models.PositiveIntegerField(default=0)
+    movies_synced = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
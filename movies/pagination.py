@@ -0,0 +1,44 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+
+class MovieMirrorPagination(PageNumberPagination):
+    """
+    Page number pagination answering in the same shape as the third-party movie api,
+    so clients of `/movies/` can't tell whether a page came from the local mirror.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def __init__(self):
+        self.page_size = settings.MOVIE_MIRROR_PAGE_SIZE
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.page.paginator.count,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "data": data,
+            }
+        )
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the primary key, for lists that grow with user data.
+
+    Every page is one indexed range query (`id > <last id seen>`) whatever its depth, and
+    the cursors in the `next`/`previous` links are opaque. The page size defaults to
+    COLLECTION_PAGE_SIZE and can be lowered or raised (up to `max_page_size`) with
+    `?page_size=`.
+    """
+
+    ordering = "id"
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def __init__(self):
+        self.page_size = settings.COLLECTION_PAGE_SIZE
@@ -1,3 +1,5 @@
+import uuid
+from django.conf import settings
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
@@ -32,3 +34,99 @@ class GetCollectionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Collection
         fields = ["uuid", "title", "description"]
+
+
+class ValuesSerializer(object):
+    """
+    Fast path for read endpoints: serializes querysets through `values()`, without
+    instantiating models or running DRF fields per object. The output for the default
+    field set is the same as the matching ModelSerializer's.
+
+    `?fields=` selects a subset of `fields` (a sparse fieldset), the other columns are not
+    selected in SQL nor rendered. Empty names are ignored, `?fields=,` is no filter.
+
+    Example:
+    --------
+    ```python
+    fields = FastMovieSerializer.get_fields(request)  # ?fields=uuid,title
+    data = FastMovieSerializer.serialize(Movies.objects.all(), fields)
+    ```
+    """
+
+    fields = []
+
+    @classmethod
+    def get_fields(cls, request, param="fields"):
+        value = request.query_params.get(param) or ""
+        requested = {field.strip() for field in value.split(",") if field.strip()}
+        if not requested:
+            return list(cls.fields)
+        unknown = sorted(requested - set(cls.fields))
+        if unknown:
+            raise serializers.ValidationError(
+                {param: ["Unknown field(s): %s." % ", ".join(unknown)]}
+            )
+        # keep the order of the default representation.
+        return [field for field in cls.fields if field in requested]
+
+    @staticmethod
+    def values(queryset, fields, extra=()):
+        """`extra` columns are selected too, e.g. the cursor pagination ordering."""
+        return queryset.values(*dict.fromkeys(list(extra) + list(fields)))
+
+    @staticmethod
+    def to_representation(row, fields):
+        return {
+            field: str(row[field]) if isinstance(row[field], uuid.UUID) else row[field]
+            for field in fields
+        }
+
+    @classmethod
+    def serialize(cls, rows, fields):
+        return [cls.to_representation(row, fields) for row in rows]
+
+
+class FastMovieSerializer(ValuesSerializer):
+    fields = MovieSerializer.Meta.fields
+
+
+class FastCollectionSerializer(ValuesSerializer):
+    fields = GetCollectionSerializer.Meta.fields
+
+
+class CollectionMoviesDeltaSerializer(serializers.Serializer):
+    add = serializers.ListField(child=serializers.UUIDField(), default=list)
+    remove = serializers.ListField(child=serializers.UUIDField(), default=list)
+
+    def validate(self, attrs):
+        if set(attrs["add"]) & set(attrs["remove"]):
+            raise serializers.ValidationError(
+                "A movie can't be both added and removed."
+            )
+        return attrs
+
+
+class CollectionBatchSerializer(serializers.Serializer):
+    uuids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+
+    def validate_uuids(self, value):
+        if len(value) > settings.COLLECTION_BATCH_MAX_SIZE:
+            raise serializers.ValidationError(
+                "At most %d collections can be requested at once."
+                % settings.COLLECTION_BATCH_MAX_SIZE
+            )
+        # keep the order of the request, without duplicates.
+        return list(dict.fromkeys(value))
+
+
+class ImportMovieSerializer(serializers.Serializer):
+    uuid = serializers.UUIDField()
+    title = serializers.CharField(max_length=225)
+    description = serializers.CharField(max_length=225, allow_blank=True)
+    genres = serializers.CharField(max_length=225, allow_blank=True, default="")
+
+
+class ImportCollectionSerializer(serializers.Serializer):
+    title = serializers.CharField(max_length=225)
+    description = serializers.CharField(max_length=225, allow_blank=True)
+    movies = ImportMovieSerializer(many=True, default=list)
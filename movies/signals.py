@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from utility.collection_version import CollectionVersion
+from utility.genre_histogram import GenreHistogram
+from utility.response_cache import ResponseCache
+from utility.user_cache import UserCache
+from .models import Collection, Genre, Movies
+
+
+def _pairs(instance, reverse, pk_set):
+    # m2m_changed can come from either side of the relation.
+    if reverse:
+        return [(collection_id, instance.pk) for collection_id in pk_set]
+    return [(instance.pk, movie_id) for movie_id in pk_set]
+
+
+@receiver(m2m_changed, sender=Collection.movies.through)
+def update_genre_histogram_on_membership(
+    sender, instance, action, reverse, model, pk_set, **kwargs
+):
+    if action == "post_add":
+        GenreHistogram.movies_added(_pairs(instance, reverse, pk_set))
+    elif action == "post_remove":
+        GenreHistogram.movies_removed(_pairs(instance, reverse, pk_set))
+    elif action == "pre_clear":
+        # pk_set is not given for clear, read the members before they are gone.
+        if reverse:
+            pk_set = instance.collections.values_list("id", flat=True)
+        else:
+            pk_set = instance.movies.values_list("id", flat=True)
+        GenreHistogram.movies_removed(_pairs(instance, reverse, pk_set))
+
+
+@receiver(pre_delete, sender=Collection)
+def update_genre_histogram_on_collection_delete(sender, instance, **kwargs):
+    # the cascade on the through table sends no m2m_changed.
+    GenreHistogram.movies_removed(
+        _pairs(instance, False, instance.movies.values_list("id", flat=True))
+    )
+
+
+@receiver(pre_delete, sender=Movies)
+def update_genre_histogram_on_movie_delete(sender, instance, **kwargs):
+    GenreHistogram.movies_removed(
+        _pairs(instance, True, instance.collections.values_list("id", flat=True))
+    )
+
+
+@receiver(pre_save, sender=Movies)
+def remember_movie_genres(sender, instance, **kwargs):
+    if instance.pk is None or hasattr(instance, "_loaded_genres"):
+        return
+    instance._loaded_genres = (
+        Movies.objects.filter(pk=instance.pk).values_list("genres", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Movies)
+def update_genres_on_genre_edit(sender, instance, created, **kwargs):
+    old_genres = getattr(instance, "_loaded_genres", None)
+    if created or old_genres != instance.genres:
+        Genre.objects.sync_movies([instance.pk])
+    if not created and old_genres is not None and old_genres != instance.genres:
+        GenreHistogram.genres_changed({instance.pk: old_genres})
+    instance._loaded_genres = instance.genres
+
+
+@receiver(post_save, sender=Collection)
+@receiver(post_delete, sender=Collection)
+def invalidate_collection_responses(sender, instance, **kwargs):
+    ResponseCache.invalidate_collections([(instance.uuid, instance.user_id)])
+
+
+@receiver(m2m_changed, sender=Collection.movies.through)
+def invalidate_collection_responses_on_membership(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            CollectionVersion.bump(Collection.objects.filter(pk=instance.pk))
+            ResponseCache.invalidate_collections([(instance.uuid, instance.user_id)])
+        return
+
+    # the instance is a movie, find the collections it is added to or removed from.
+    if action in ("post_add", "post_remove"):
+        collections = Collection.objects.filter(id__in=pk_set)
+    elif action == "pre_clear":
+        collections = Collection.objects.filter(
+            id__in=list(instance.collections.values_list("id", flat=True))
+        )
+    else:
+        return
+    CollectionVersion.bump(collections)
+    ResponseCache.invalidate_collections(collections.values_list("uuid", "user_id"))
+
+
+@receiver(post_save, sender=Movies)
+@receiver(pre_delete, sender=Movies)
+def invalidate_collection_responses_on_movie_change(
+    sender, instance, created=False, **kwargs
+):
+    if not created:
+        CollectionVersion.bump_for_movies([instance.pk])
+        ResponseCache.invalidate_movies([instance.pk])
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_user(sender, instance, **kwargs):
+    UserCache.invalidate(instance.pk)
@@ -0,0 +1,69 @@
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+from utility.token_bucket import TokenBucket
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    DRF throttle on a TokenBucket shared by every worker.
+
+    `rate_setting` names a setting in the DRF rate format (e.g. "60/min"), the sustained
+    rate at which tokens are refilled, and `burst_setting` the size of the bucket. An
+    empty rate disables the throttle. Refused requests get 429 with Retry-After.
+    """
+
+    scope = None
+    rate_setting = None
+    burst_setting = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    @staticmethod
+    def parse_rate(rate):
+        """Returns the refill rate in tokens per second of a "<number>/<s|m|h|d>" rate."""
+        num, period = rate.split("/")
+        duration = {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+        return int(num) / duration
+
+    def get_bucket_name(self, request, view):
+        raise NotImplementedError(".get_bucket_name() must be overridden")
+
+    def allow_request(self, request, view):
+        rate = getattr(settings, self.rate_setting)
+        if not rate:
+            return True
+        bucket = TokenBucket(
+            "%s:%s" % (self.scope, self.get_bucket_name(request, view)),
+            rate=self.parse_rate(rate),
+            capacity=getattr(settings, self.burst_setting),
+        )
+        allowed, self.wait_seconds = bucket.consume()
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class MovieListUserThrottle(TokenBucketThrottle):
+    """Per user (or per client ip when anonymous) throttle of the movie list."""
+
+    scope = "movie_list_user"
+    rate_setting = "MOVIE_LIST_USER_THROTTLE_RATE"
+    burst_setting = "MOVIE_LIST_USER_THROTTLE_BURST"
+
+    def get_bucket_name(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return "user:%s" % request.user.pk
+        return "ip:%s" % self.get_ident(request)
+
+
+class MovieListGlobalThrottle(TokenBucketThrottle):
+    """Throttle of the movie list across all users, to protect the upstream api quota."""
+
+    scope = "movie_list_global"
+    rate_setting = "MOVIE_LIST_GLOBAL_THROTTLE_RATE"
+    burst_setting = "MOVIE_LIST_GLOBAL_THROTTLE_BURST"
+
+    def get_bucket_name(self, request, view):
+        return "all"
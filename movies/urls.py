@@ -2,25 +2,51 @@ from django.urls import path
 from .views import (
     RegisterUser,
     MovieList,
+    MovieApiStatus,
     MovieCollection,
     LoginUser,
+    RefreshAccessToken,
     MovieCollectionDetails,
+    CollectionBatch,
+    CollectionImportView,
+    CollectionExportView,
+    CollectionMovies,
     RequestCount,
     RequestCountRest,
+    RequestCountRates,
+    PrometheusMetrics,
 )
 
 urlpatterns = [
     path("register/", RegisterUser.as_view(), name="register"),
     path("login/", LoginUser.as_view(), name="login"),
+    path("token/refresh/", RefreshAccessToken.as_view(), name="token-refresh"),
     path("movies/", MovieList.as_view(), name="movies"),
+    path("movies/status/", MovieApiStatus.as_view(), name="movies-status"),
     path("collection/", MovieCollection.as_view(), name="collection"),
+    path("collection/batch/", CollectionBatch.as_view(), name="collection-batch"),
+    path(
+        "collection/import/", CollectionImportView.as_view(), name="collection-import"
+    ),
+    path(
+        "collection/export/", CollectionExportView.as_view(), name="collection-export"
+    ),
     path(
         "collection/<str:uuid>/",
         MovieCollectionDetails.as_view(),
         name="collection-details",
     ),
+    path(
+        "collection/<str:uuid>/movies/",
+        CollectionMovies.as_view(),
+        name="collection-movies",
+    ),
     path("request-count/", RequestCount.as_view(), name="request-count"),
     path(
         "request-count/reset/", RequestCountRest.as_view(), name="request-count-reset"
     ),
+    path(
+        "request-count/rates/", RequestCountRates.as_view(), name="request-count-rates"
+    ),
+    path("metrics/", PrometheusMetrics.as_view(), name="metrics"),
 ]
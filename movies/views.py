@@ -1,25 +1,70 @@
+import uuid
+from django.conf import settings
 from django.contrib.auth import authenticate
-from django.core.cache import cache
+from django.db import transaction
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+    TokenError,
+)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from decouple import config
+from utility.collection_export import CollectionExport
+from utility.collection_import import CollectionImport, CollectionImportError
+from utility.collection_version import CollectionVersion
+from utility.db_router import ReadYourWrites
+from utility.movie_catalog import MovieCatalog
+from utility.metrics import metrics
+from utility.request_counter import request_counter
+from utility.request_rates import request_rates
+from utility.response_cache import ResponseCache
+from utility.user_cache import UserCache
 from utility.retry_mechanism import RetryStrategy
 from .serializers import (
     UserCreationSerializer,
+    CollectionBatchSerializer,
     CollectionSerializer,
-    GetCollectionSerializer,
+    CollectionMoviesDeltaSerializer,
+    FastCollectionSerializer,
+    FastMovieSerializer,
     MovieSerializer,
 )
-from .models import Collection, Movies
-from utility.movie_helper import TopFavouriteGenres
+from .models import Collection, Genre, Movies
+from .pagination import IdCursorPagination, MovieMirrorPagination
+from .throttling import MovieListGlobalThrottle, MovieListUserThrottle
+from utility.genre_histogram import GenreHistogram
 
 # Create your views here.
 
 
 class LoginUser(APIView):
+    """
+    View for user login, returns an access token and the refresh token to renew it with
+    token/refresh/ (without sending the password again) once it expires.
+
+    Response (Success):
+    ```
+    HTTP 201 Created
+    {
+        "access_token": "<access_token>",
+        "refresh_token": "<refresh_token>"
+    }
+    ```
+    """
+
     permission_classes = [AllowAny]
 
     def post(self, request):
@@ -30,10 +75,9 @@ class LoginUser(APIView):
             token = RefreshToken.for_user(
                 user
             )  # for authenticated user jwt token is created
-            # refresh_token = str(token)
-            access_token = str(token.access_token)
             return Response(
-                {"access_token": access_token}, status=status.HTTP_201_CREATED
+                {"access_token": str(token.access_token), "refresh_token": str(token)},
+                status=status.HTTP_201_CREATED,
             )
         return Response(
             {"message": "User authentication failed"},
@@ -49,8 +93,8 @@ class RegisterUser(APIView):
 
     Methods:
     - POST: Accepts user registration data, validates it using UserCreationSerializer,
-            and creates a new user if the data is valid. After authenticate the user
-            and create jwt token for that user.
+            and creates a new user if the data is valid. The jwt tokens are issued for
+            the created user directly, the password is only hashed once.
 
     Serializer Used:
     - UserCreationSerializer: Handles the serialization and validation of user creation data.
@@ -69,7 +113,8 @@ class RegisterUser(APIView):
     ```
     HTTP 201 Created
     {
-    "access_token": "<access_token>"
+    "access_token": "<access_token>",
+    "refresh_token": "<refresh_token>"
     }
     ```
 
@@ -81,13 +126,6 @@ class RegisterUser(APIView):
         "password": ["This field is required."]
     }
     ```
-    Response (Error) - authentication failed:
-    ```
-    HTTP 400 Bad Request
-    {
-        "message": "User authentication failed"
-    }
-    ```
     """
 
     permission_classes = [AllowAny]
@@ -95,26 +133,74 @@ class RegisterUser(APIView):
     def post(self, request):
         serializer = UserCreationSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()  # new user created
-            user = authenticate(
-                username=request.data["username"], password=request.data["password"]
-            )  # authenticate user
-            if user is not None:
-                token = RefreshToken.for_user(
-                    user
-                )  # for authenticated user jwt token is created
-                # refresh_token = str(token)
-                access_token = str(token.access_token)
-                return Response(
-                    {"access_token": access_token}, status=status.HTTP_201_CREATED
-                )
+            user = serializer.save()  # new user created
+            token = RefreshToken.for_user(user)
             return Response(
-                {"message": "User authentication failed"},
-                status=status.HTTP_400_BAD_REQUEST,
+                {"access_token": str(token.access_token), "refresh_token": str(token)},
+                status=status.HTTP_201_CREATED,
             )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class RefreshAccessToken(APIView):
+    """
+    View issuing a new access token from the refresh token returned by login/ and
+    register/, without checking the password again.
+
+    The refresh token is verified from its signature; the user is read from UserCache
+    so deactivated and deleted users can't renew their tokens.
+
+    Example Usage:
+    ```
+    POST /token/refresh/
+    {
+        "refresh_token": "<refresh_token>"
+    }
+    ```
+
+    Response (Success):
+    ```
+    HTTP 200 OK
+    {
+        "access_token": "<access_token>"
+    }
+    ```
+
+    Response (Error) - invalid or expired refresh token:
+    ```
+    HTTP 401 Unauthorized
+    {
+        "detail": "Token is invalid or expired",
+        "code": "token_not_valid"
+    }
+    ```
+    """
+
+    permission_classes = [AllowAny]
+    # an expired access token sent along must not get the refresh refused.
+    authentication_classes = []
+
+    def get_authenticate_header(self, request):
+        # answer invalid tokens with 401 like the authenticated views, not 403.
+        return 'Bearer realm="api"'
+
+    def post(self, request):
+        if not request.data.get("refresh_token"):
+            context = {"refresh_token": ["This field is required."]}
+            return Response(context, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            refresh = RefreshToken(request.data["refresh_token"])
+        except TokenError as exc:
+            raise InvalidToken(exc.args[0])
+
+        user = UserCache.get(refresh[jwt_settings.USER_ID_CLAIM])
+        if user is None or not user.is_active:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+
+        context = {"access_token": str(refresh.access_token)}
+        return Response(context, status=status.HTTP_200_OK)
+
+
 class MovieList(APIView):
     """
     View for retrieving a list of movies from a third-party API.
@@ -129,12 +215,34 @@ class MovieList(APIView):
       and 'API_CLIENT_SECRET' environment variables.
 
     Retry Mechanism:
-    - The RetryStrategy.retry_mechanism method is called to make the API request with built-in retry logic.
+    - The RetryStrategy.fetch method is called to make the API request with built-in retry logic.
       This helps handle potential flakiness or timeouts of the third-party API.
 
+    Local mirror:
+    - With MOVIE_LIST_SOURCE=mirror, pages are served from the Movies table filled by the
+      `sync_movies` management command, in the same shape and without calling the third-party API.
+      `?fields=uuid,title` only returns (and selects) those fields of the movies.
+
+    Pass-through:
+    - With MOVIE_LIST_SOURCE=stream, the body of the third-party API is relayed to the client
+      chunk by chunk as it arrives, without being parsed or re-serialized. Only the status and
+      headers are inspected, the page is not cached.
+
+    Caching:
+    - Successful pages are cached per `?page=` by MovieCatalog, other query parameters are
+      not sent to the third-party API. After
+      MOVIE_API_CACHE_TTL seconds the stale page is still served while a single background
+      refresh runs, so the retry backoff is kept off the request path.
+
+    Conditional requests:
+    - The ETag and Last-Modified headers of the third-party API are passed on to the client.
+      A matching If-None-Match (or If-Modified-Since) is answered with 304 Not Modified from
+      the cached validators; in pass-through mode they are forwarded to the third-party API
+      and its 304 is relayed.
+
     Example Usage:
     ```
-    GET /movies/
+    GET /movies/?page=2
     ```
 
     Response (Success):
@@ -164,26 +272,136 @@ class MovieList(APIView):
          "status_code": 500
      }
     ```
+    Response (Error) - circuit open and page not cached:
+    ```
+    HTTP 200 OK
+    {
+         "message": "Movie service is temporarily unavailable, please try again later.",
+         "status_code": 503,
+         "degraded": true,
+         "retry_after": <seconds until the next probe>
+     }
+    ```
 
     Environment Variables:
     - MOVIE_API_URL: The URL of the third-party movie API.
     - API_CLIENT: API client username.
     - API_CLIENT_SECRET: API client password.
 
+    Throttling:
+    - Requests are throttled per user and for all users together by token buckets shared
+      by every worker (see movies.throttling), to protect the third-party API quota and
+      the worker pool. Throttled requests get HTTP 429 with a Retry-After header.
+
     Dependencies:
     - RetryStrategy: A custom class or module providing retry mechanisms for API requests.
+    - MovieCatalog: Redis backed cache in front of the third-party API.
 
     """
 
+    throttle_classes = [MovieListUserThrottle, MovieListGlobalThrottle]
+
+    def check_throttles(self, request):
+        # stop at the first refusal, a throttled user must not drain the global bucket.
+        for throttle in self.get_throttles():
+            if not throttle.allow_request(request, self):
+                self.throttled(request, throttle.wait())
+
     def get(self, request):
+        if settings.MOVIE_LIST_SOURCE == "mirror":
+            return self.get_from_mirror(request)
+
         url = config("MOVIE_API_URL")
         username = config("API_CLIENT")
         password = config("API_CLIENT_SECRET")
 
-        api_res = RetryStrategy.retry_mechanism(
-            url, username=username, password=password, verify=False
+        catalog = MovieCatalog(url, username=username, password=password, verify=False)
+        if settings.MOVIE_LIST_SOURCE == "stream":
+            return self.get_streamed(catalog, request)
+
+        api_res, validators = catalog.get_page(request.query_params.dict())
+        not_modified = get_conditional_response(
+            request,
+            etag=validators.get("ETag"),
+            last_modified=parse_http_date_safe(validators.get("Last-Modified") or ""),
         )
-        return Response(api_res)
+        response = not_modified or Response(api_res)
+        return self.set_validators(response, validators)
+
+    @staticmethod
+    def set_validators(response, validators):
+        for header, value in validators.items():
+            response[header] = value
+        return response
+
+    def get_streamed(self, catalog, request):
+        conditional_headers = {
+            header: request.headers[header]
+            for header in ("If-None-Match", "If-Modified-Since")
+            if header in request.headers
+        }
+        is_success, upstream = catalog.open(
+            request.query_params.dict(), stream=True, headers=conditional_headers
+        )
+        if not is_success:
+            return Response(upstream)
+
+        validators = MovieCatalog.get_validators(upstream)
+        if upstream.status_code == 304:
+            upstream.close()
+            return self.set_validators(HttpResponseNotModified(), validators)
+
+        def relay():
+            try:
+                yield from upstream.iter_content(
+                    chunk_size=settings.MOVIE_API_STREAM_CHUNK_SIZE
+                )
+            finally:
+                upstream.close()  # hand the connection back to the pool
+
+        return self.set_validators(
+            StreamingHttpResponse(
+                relay(),
+                content_type=upstream.headers.get("Content-Type", "application/json"),
+            ),
+            validators,
+        )
+
+    def get_from_mirror(self, request):
+        fields = FastMovieSerializer.get_fields(request)
+        paginator = MovieMirrorPagination()
+        page = paginator.paginate_queryset(
+            FastMovieSerializer.values(Movies.objects.order_by("id"), fields),
+            request,
+            view=self,
+        )
+        return paginator.get_paginated_response(
+            FastMovieSerializer.serialize(page, fields)
+        )
+
+
+class MovieApiStatus(APIView):
+    """
+    View exposing the circuit breaker guarding the third-party movie API, for monitoring.
+
+    Example Response:
+    ```
+    {
+        "name": "movies.example.com",
+        "state": "open",
+        "opened_at": 1707030000.0,
+        "retry_after": 12,
+        "failures": 0,
+        "transitions": {"closed": 3, "open": 4, "half_open": 4}
+    }
+    ```
+    """
+
+    def get(self, request, *args, **kwargs):
+        breaker = RetryStrategy.get_breaker(config("MOVIE_API_URL"))
+        if breaker is None:
+            return Response({"state": "disabled"}, status=status.HTTP_200_OK)
+        return Response(breaker.status(), status=status.HTTP_200_OK)
 
 
 class MovieCollection(generics.ListCreateAPIView):
@@ -191,11 +409,18 @@ class MovieCollection(generics.ListCreateAPIView):
     A view for handling the retrieval and creation of movie collections.
 
     - GET: Retrieve a user's movie collections along with their top 3 favorite genres.
-      Response includes serialized collection data and favorite genres.
+      Response includes serialized collection data and favorite genres. Collections are
+      returned COLLECTION_PAGE_SIZE at a time (or `?page_size=`), follow the `next` cursor
+      link for the following page. Responses are cached per user until one of their
+      collections changes, and carry an ETag: a request with a matching If-None-Match
+      gets an empty 304 Not Modified. Read from the primary database, a response built
+      from a lagging replica would be cached under the new version.
+      `?fields=uuid,title` only returns (and selects) those fields of the collections.
 
     - POST: Create a new movie collection for the authenticated user.
       Request data should include title, description, and a list of movies
-      with UUID, title, description, and genres.
+      with UUID, title, description, and genres. Runs in a single transaction with
+      a constant number of queries whatever the number of movies.
 
     Parameters:
     - `request`: The HTTP request object.
@@ -210,7 +435,11 @@ class MovieCollection(generics.ListCreateAPIView):
     ```
     {
         "is_success": True,
-        "data": {"collection": [...serialized collection data...]},
+        "data": {
+            "collection": [...serialized collection data...],
+            "next": "http://host/collection/?cursor=cD0xMDA%3D",
+            "previous": null
+        },
         "favourite_genres": ["Horror", "Action", "Comedy"]
     }
     ```
@@ -227,48 +456,82 @@ class MovieCollection(generics.ListCreateAPIView):
     - HTTP 201 Created for successful POST requests.
     """
 
-    def get(self, request, *args, **kwargs):
-        collections = Collection.objects.filter(user=request.user)
-        serializer = GetCollectionSerializer(collections, many=True)
+    pagination_class = IdCursorPagination
 
-        collection_list = {"collection": serializer.data}
-        favourite_genres = (
-            TopFavouriteGenres().top_favourite_genres_from_user_movie_collection(
-                collections, n=3
+    @ReadYourWrites.primary()
+    def get(self, request, *args, **kwargs):
+        validators = CollectionVersion.for_user(request)
+        not_modified = CollectionVersion.conditional_response(request, validators)
+        if not_modified is not None:
+            return CollectionVersion.set_headers(not_modified, validators)
+
+        scope = ResponseCache.user_scope(request.user.id)
+        context = ResponseCache.get(scope, request)
+        if context is not None:
+            return CollectionVersion.set_headers(
+                Response(context, status=status.HTTP_200_OK), validators
             )
+
+        fields = FastCollectionSerializer.get_fields(request)
+        collections = FastCollectionSerializer.values(
+            Collection.objects.filter(user=request.user), fields, extra=["id"]
         )
+        page = self.paginate_queryset(collections)
+
+        collection_list = {
+            "collection": FastCollectionSerializer.serialize(page, fields),
+            "next": self.paginator.get_next_link(),
+            "previous": self.paginator.get_previous_link(),
+        }
+        favourite_genres = GenreHistogram.top_favourite_genres(request.user, n=3)
 
         context = {
             "is_success": True,
             "data": collection_list,
             "favourite_genres": favourite_genres,
         }
-        return Response(context, status=status.HTTP_200_OK)
+        ResponseCache.set(scope, request, context)
+        return CollectionVersion.set_headers(
+            Response(context, status=status.HTTP_200_OK), validators
+        )
 
     def create(self, request, *args, **kwargs):
         data = request.data
-        new_collection = Collection.objects.create(
-            title=data["title"], description=data["description"], user=request.user
-        )  # create a collection
-        new_collection.save()
-
-        # iterate through list of movies, if movies not in db create, else get that movie obj and add it to the
-        # above created collection.
-        for movie in data["movies"]:
-            if Movies.objects.filter(uuid=movie["uuid"]).exists():
-                movie_obj = Movies.objects.get(uuid=movie["uuid"])
-            else:
-                movie_obj = Movies.objects.create(
-                    uuid=movie["uuid"],
-                    title=movie["title"],
-                    description=movie["description"],
-                    genres=movie["genres"],
+        movies = {movie["uuid"]: movie for movie in data["movies"]}
+
+        with transaction.atomic():
+            new_collection = Collection.objects.create(
+                title=data["title"], description=data["description"], user=request.user
+            )  # create a collection
+
+            # insert the movies not in db yet in one query, movies already in db are kept as they are.
+            Movies.objects.bulk_create(
+                [
+                    Movies(
+                        uuid=movie["uuid"],
+                        title=movie["title"],
+                        description=movie["description"],
+                        genres=movie["genres"],
+                    )
+                    for movie in movies.values()
+                ],
+                ignore_conflicts=True,
+            )
+            # add all of them to the above created collection with one insert into the through table.
+            movie_ids = list(
+                Movies.objects.filter(uuid__in=movies.keys()).values_list(
+                    "id", flat=True
                 )
+            )
+            new_collection.movies.add(*movie_ids)
+            # bulk_create sends no post_save, normalize the genres of new movies here.
+            Genre.objects.sync_movies(
+                Movies.objects.filter(
+                    id__in=movie_ids, movie_genres__isnull=True
+                ).values_list("id", flat=True)
+            )
 
-            new_collection.movies.add(movie_obj)
-
-        serializer = CollectionSerializer(new_collection)
-        context = {"collection_uuid": serializer.data["uuid"]}
+        context = {"collection_uuid": str(new_collection.uuid)}
         return Response(context, status=status.HTTP_201_CREATED)
 
 
@@ -277,10 +540,17 @@ class MovieCollectionDetails(generics.RetrieveUpdateDestroyAPIView):
     A view for retrieving, updating, and deleting a movie collection.
 
     - GET: Retrieve details of a movie collection, including title, description, and associated movies.
+      Movies are paginated by cursor like the collection list, `?genre=<name>` only returns
+      the movies of that genre. Responses are cached until the collection or one of its
+      movies changes, and are validated with ETag and Last-Modified: a request with a
+      matching If-None-Match (or If-Modified-Since) gets an empty 304 Not Modified.
+      Read from the primary database, like the collection list.
+      `?fields=uuid,title` only returns (and selects) those fields of the movies.
 
     - PUT/PATCH: Update a movie collection's details and associated movies. The request should include
       optional fields such as 'title', 'description', and 'movies' (a list of movies with UUID, title,
-      description, and other details).
+      description, and other details). All movies are fetched and updated in bulk within one
+      transaction; if any of them is unknown, not in the collection or invalid nothing is updated.
 
     - DELETE: Delete a movie collection.
 
@@ -303,7 +573,9 @@ class MovieCollectionDetails(generics.RetrieveUpdateDestroyAPIView):
             {"uuid": "movie_uuid_1", "title": "Movie 1", "description": "description 1", "genre":genre1},
             {"uuid": "movie_uuid_2", "title": "Movie 2", "description": "description 2", "genre":genre2},
             ...
-        ]
+        ],
+        "next": "http://host/collection/<uuid>/?cursor=cD0xMDA%3D",
+        "previous": null
     }
     ```
 
@@ -325,6 +597,22 @@ class MovieCollectionDetails(generics.RetrieveUpdateDestroyAPIView):
     {"details": "updated"}
     ```
 
+    Example PUT/PATCH Response (Error):
+    ```
+    HTTP 400 Bad Request
+    {
+        "message": "Movies could not be updated.",
+        "missing": ["movie_uuid_3"],
+        "not_in_collection": ["movie_uuid_4"],
+        "errors": {
+            "movie_uuid_5": {"title": ["This field may not be blank."]},
+            "2": {"uuid": ["Must be a valid UUID."]}
+        }
+    }
+    ```
+    Malformed items (not an object, no or an invalid uuid) are reported in `errors` by
+    their position in `movies`.
+
     Example DELETE Response:
     ```
     {"detail": "Successfully deleted."}
@@ -335,36 +623,141 @@ class MovieCollectionDetails(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = CollectionSerializer
     lookup_field = "uuid"
 
+    @ReadYourWrites.primary()
     def get(self, request, *args, **kwargs):
+        try:
+            # signals invalidate the canonical uuid, the url may be in upper case.
+            collection_uuid = str(uuid.UUID(kwargs["uuid"]))
+        except ValueError:
+            raise Http404
+        validators = CollectionVersion.for_collection(request, collection_uuid)
+        not_modified = CollectionVersion.conditional_response(request, validators)
+        if not_modified is not None:
+            return CollectionVersion.set_headers(not_modified, validators)
+
+        scope = ResponseCache.collection_scope(collection_uuid)
+        context = ResponseCache.get(scope, request)
+        if context is not None:
+            return CollectionVersion.set_headers(
+                Response(context, status=status.HTTP_200_OK), validators
+            )
+
+        fields = FastMovieSerializer.get_fields(request)
         instance = self.get_object()
-        serializer = self.get_serializer(instance)
 
-        # include needed data in the context
-        movies_data = MovieSerializer(instance.movies.all(), many=True).data
+        # include needed data in the context, one page of movies at a time
+        movies = instance.movies.all()
+        if "genre" in request.query_params:
+            movies = movies.filter(genre_tags__name=request.query_params["genre"])
+        paginator = IdCursorPagination()
+        page = paginator.paginate_queryset(
+            FastMovieSerializer.values(movies, fields, extra=["id"]), request, view=self
+        )
+        movies_data = FastMovieSerializer.serialize(page, fields)
         context = {
-            "title": serializer.data["title"],
-            "description": serializer.data["description"],
+            "title": instance.title,
+            "description": instance.description,
             "movies": movies_data,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
         }
-        return Response(context, status=status.HTTP_200_OK)
+        ResponseCache.set(scope, request, context)
+        return CollectionVersion.set_headers(
+            Response(context, status=status.HTTP_200_OK), validators
+        )
 
     def update(self, request, *args, **kwargs):
-        if "movies" in request.data:
-            movies = request.data.pop("movies")
-            for movie in movies:
-                movie_instance = Movies.objects.get(uuid=movie["uuid"])
-                movie_serializer = MovieSerializer(
-                    movie_instance, data=movie, partial=True
-                )
-                movie_serializer.is_valid(raise_exception=True)
-                self.perform_update(movie_serializer)
-
         instance = self.get_object()
-        serializer = self.get_serializer(instance, data=request.data, partial=True)
-        serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
+        with transaction.atomic():
+            if "movies" in request.data:
+                movies = request.data.pop("movies")
+                errors = self.update_movies(instance, movies)
+                if errors:
+                    return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+            serializer = self.get_serializer(instance, data=request.data, partial=True)
+            serializer.is_valid(raise_exception=True)
+            self.perform_update(serializer)
         return Response({"details": "updated"})
 
+    @staticmethod
+    def update_movies(instance, movies):
+        """
+        Updates the given movies of the collection with one fetch and one bulk update.
+
+        Every movie is validated before anything is written. Returns a dict describing
+        the movies that are unknown, not part of the collection or invalid, or None
+        once all of them are updated.
+        """
+        message = "Movies could not be updated."
+        if not isinstance(movies, list):
+            return {"message": message, "errors": {"movies": ["Expected a list."]}}
+
+        movies_by_uuid = {}
+        # malformed items are reported by position, the other errors by movie uuid.
+        errors = {}
+        for index, movie in enumerate(movies):
+            if not isinstance(movie, dict):
+                errors[str(index)] = ["Expected a movie object."]
+                continue
+            if "uuid" not in movie:
+                errors[str(index)] = {"uuid": ["This field is required."]}
+                continue
+            try:
+                movies_by_uuid[uuid.UUID(str(movie["uuid"]))] = movie
+            except ValueError:
+                errors[str(index)] = {"uuid": ["Must be a valid UUID."]}
+
+        members = instance.movies.in_bulk(movies_by_uuid.keys(), field_name="uuid")
+
+        updated_fields = set()
+        for movie_uuid, movie in movies_by_uuid.items():
+            if movie_uuid not in members:
+                continue
+            movie_serializer = MovieSerializer(
+                members[movie_uuid], data=movie, partial=True
+            )
+            if not movie_serializer.is_valid():
+                errors[str(movie_uuid)] = movie_serializer.errors
+                continue
+            for field, value in movie_serializer.validated_data.items():
+                setattr(members[movie_uuid], field, value)
+                updated_fields.add(field)
+
+        not_found = set(movies_by_uuid) - set(members)
+        if errors or not_found:
+            # only the failure path pays for telling unknown movies from non members.
+            existing = set(
+                Movies.objects.filter(uuid__in=not_found).values_list("uuid", flat=True)
+            )
+            context = {"message": message}
+            if not_found - existing:
+                context["missing"] = [
+                    str(movie_uuid) for movie_uuid in not_found - existing
+                ]
+            if existing:
+                context["not_in_collection"] = [
+                    str(movie_uuid) for movie_uuid in existing
+                ]
+            if errors:
+                context["errors"] = errors
+            return context
+
+        if updated_fields:
+            genre_changes = {
+                movie.pk: movie._loaded_genres
+                for movie in members.values()
+                if movie._loaded_genres != movie.genres
+            }
+            Movies.objects.bulk_update(members.values(), sorted(updated_fields))
+            # bulk_update sends no post_save, keep the genres and cached responses in step here.
+            Genre.objects.sync_movies(genre_changes.keys())
+            GenreHistogram.genres_changed(genre_changes)
+            movie_ids = [movie.pk for movie in members.values()]
+            CollectionVersion.bump_for_movies(movie_ids)
+            ResponseCache.invalidate_movies(movie_ids)
+        return None
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         self.perform_destroy(instance)
@@ -373,15 +766,325 @@ class MovieCollectionDetails(generics.RetrieveUpdateDestroyAPIView):
         )
 
 
+class CollectionBatch(generics.GenericAPIView):
+    """
+    A view for reading several of the user's collections, with their movies, in one request.
+
+    - GET: `?uuids=<uuid>,<uuid>,...` (at most COLLECTION_BATCH_MAX_SIZE). Collections are
+      returned in the requested order, with all of their movies, using one query for the
+      collections and one for all of their movies whatever the number of collections.
+      Uuids that are unknown or belong to another user are listed under `not_found`.
+      `?fields=uuid,title` only returns (and selects) those fields of the movies.
+
+    Example GET Request:
+    ```
+    GET /collection/batch/?uuids=collection_uuid_1,collection_uuid_2,collection_uuid_3
+    ```
+
+    Example GET Response:
+    ```
+    {
+        "collections": [
+            {
+                "uuid": "collection_uuid_1",
+                "title": "Collection title",
+                "description": "Collection description",
+                "movies": [
+                    {"uuid": "movie_uuid_1", "title": "Movie 1", "description": "description 1", "genres": "Drama"},
+                    ...
+                ]
+            },
+            ...
+        ],
+        "not_found": ["collection_uuid_3"]
+    }
+    ```
+
+    Example GET Response (Error):
+    ```
+    HTTP 400 Bad Request
+    {"uuids": {"0": ["Must be a valid UUID."]}}
+    ```
+    """
+
+    serializer_class = CollectionBatchSerializer
+
+    def get_queryset(self):
+        return Collection.objects.filter(user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        fields = FastMovieSerializer.get_fields(request)
+        uuids = [
+            collection_uuid
+            for value in request.query_params.getlist("uuids")
+            for collection_uuid in value.split(",")
+            if collection_uuid
+        ]
+        serializer = self.get_serializer(data={"uuids": uuids})
+        serializer.is_valid(raise_exception=True)
+        uuids = serializer.validated_data["uuids"]
+
+        collections = {
+            row["uuid"]: dict(
+                FastCollectionSerializer.to_representation(
+                    row, FastCollectionSerializer.fields
+                ),
+                movies=[],
+            )
+            for row in FastCollectionSerializer.values(
+                self.get_queryset().filter(uuid__in=uuids),
+                FastCollectionSerializer.fields,
+            )
+        }
+        # the movies of all the collections in one query, grouped in python.
+        movies = FastMovieSerializer.values(
+            Movies.objects.filter(collections__uuid__in=collections.keys()),
+            fields,
+            extra=["collections__uuid"],
+        ).order_by("id")
+        for row in movies:
+            collections[row["collections__uuid"]]["movies"].append(
+                FastMovieSerializer.to_representation(row, fields)
+            )
+
+        context = {
+            "collections": [
+                collections[collection_uuid]
+                for collection_uuid in uuids
+                if collection_uuid in collections
+            ],
+            "not_found": [
+                str(collection_uuid)
+                for collection_uuid in uuids
+                if collection_uuid not in collections
+            ],
+        }
+        return Response(context, status=status.HTTP_200_OK)
+
+
+class CollectionImportView(APIView):
+    """
+    A view for importing many collections at once, e.g. when migrating from another app.
+
+    - POST: The body is NDJSON (one collection per line) or a JSON array of collections,
+      each shaped like the body of `POST /collection/`. It is read as a stream and imported
+      in chunks of COLLECTION_IMPORT_CHUNK_SIZE collections with bulk queries, see
+      utility.collection_import.CollectionImport. Invalid collections are skipped and
+      reported by their position in the body. Malformed JSON stops the import with a 400
+      that still reports what was imported before it, a retry should resume from there.
+
+    Example POST Request:
+    ```
+    POST /collection/import/
+    Content-Type: application/x-ndjson
+
+    {"title": "Collection 1", "description": "d", "movies": [{"uuid": "movie_uuid_1", ...}]}
+    {"title": "Collection 2", "description": "d", "movies": []}
+    ```
+
+    Example POST Response:
+    ```
+    HTTP 201 Created
+    {
+        "collections": 2,
+        "movies": 1,
+        "errors": {}
+    }
+    ```
+
+    Example POST Response (Error) - malformed JSON on the third line:
+    ```
+    HTTP 400 Bad Request
+    {
+        "message": "Invalid JSON at line 3 (byte offset 240).",
+        "collections": 2,
+        "movies": 1,
+        "errors": {}
+    }
+    ```
+    """
+
+    def post(self, request, *args, **kwargs):
+        try:
+            summary = CollectionImport(request.user).run(request.stream)
+        except CollectionImportError as exc:
+            return Response(
+                dict(exc.summary or {}, message=str(exc)),
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(summary, status=status.HTTP_201_CREATED)
+
+
+class CollectionExportView(APIView):
+    """
+    A view for exporting all of the user's collections with their movies.
+
+    - GET: Streams one collection per line as NDJSON, in the format accepted by
+      collection/import/. Collections are read COLLECTION_EXPORT_CHUNK_SIZE at a time, see
+      utility.collection_export.CollectionExport, so memory stays constant whatever the
+      size of the account.
+
+    Example GET Response:
+    ```
+    HTTP 200 OK
+    Content-Type: application/x-ndjson
+
+    {"uuid": "collection_uuid_1", "title": "Collection 1", "description": "d", "movies": [...]}
+    {"uuid": "collection_uuid_2", "title": "Collection 2", "description": "d", "movies": []}
+    ```
+    """
+
+    def get(self, request, *args, **kwargs):
+        export = CollectionExport(request.user)
+        response = StreamingHttpResponse(
+            export.lines(), content_type=export.content_type
+        )
+        response["Content-Disposition"] = 'attachment; filename="collections.ndjson"'
+        return response
+
+
+class CollectionMovies(generics.GenericAPIView):
+    """
+    A view for changing which movies are in a collection without sending the movies themselves.
+
+    - PATCH: Add and/or remove movies, identified by uuid, from one of the user's collections.
+      Movies to add must already be known (e.g. through a collection create). Additions and
+      removals each run as a single set based query on the collection movies through table.
+
+    Example PATCH Request:
+    ```
+    PATCH /collection/<uuid>/movies/
+    {
+        "add": ["movie_uuid_1", "movie_uuid_2"],
+        "remove": ["movie_uuid_3"]
+    }
+    ```
+
+    Example PATCH Response:
+    ```
+    {"details": "updated"}
+    ```
+
+    Example PATCH Response (Error) - unknown movies to add:
+    ```
+    HTTP 400 Bad Request
+    {
+        "message": "Movies could not be added.",
+        "missing": ["movie_uuid_2"]
+    }
+    ```
+    """
+
+    serializer_class = CollectionMoviesDeltaSerializer
+    lookup_field = "uuid"
+
+    def get_queryset(self):
+        return Collection.objects.filter(user=self.request.user)
+
+    def patch(self, request, *args, **kwargs):
+        instance = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        add = set(serializer.validated_data["add"])
+        remove = set(serializer.validated_data["remove"])
+
+        with transaction.atomic():
+            if add:
+                add_ids = dict(
+                    Movies.objects.filter(uuid__in=add).values_list("uuid", "id")
+                )
+                if len(add_ids) < len(add):
+                    context = {
+                        "message": "Movies could not be added.",
+                        "missing": [
+                            str(movie_uuid) for movie_uuid in add - set(add_ids)
+                        ],
+                    }
+                    return Response(context, status=status.HTTP_400_BAD_REQUEST)
+                instance.movies.add(*add_ids.values())
+            if remove:
+                instance.movies.remove(
+                    *instance.movies.filter(uuid__in=remove).values_list(
+                        "id", flat=True
+                    )
+                )
+        return Response({"details": "updated"}, status=status.HTTP_200_OK)
+
+
 class RequestCount(APIView):
+    """
+    View serving the request counts of RequestCounterMiddleware, in total and by route name
+    and status class, along with the response cache hits and misses.
+
+    Example Response:
+    ```
+    {
+        "requests": 42,
+        "routes": {"movies": {"2xx": 40, "5xx": 1}, "unmatched": {"4xx": 1}},
+        "response_cache": {"hits": 10, "misses": 3}
+    }
+    ```
+    """
+
     def get(self, request, *args, **kwargs):
-        request_count = cache.get("request_count")
-        context = {"requests": request_count}
+        context = dict(request_counter.totals(), response_cache=ResponseCache.stats())
         return Response(context, status=status.HTTP_200_OK)
 
 
 class RequestCountRest(APIView):
     def post(self, request, *args, **kwargs):
-        cache.set("request_count", 0)
+        request_counter.reset()
+        ResponseCache.reset_stats()
         context = {"message": "request count reset successfully"}
         return Response(context, status=status.HTTP_200_OK)
+
+
+class RequestCountRates(APIView):
+    """
+    View serving the current load: requests, requests per second and approximate distinct
+    users (HyperLogLog) over the last second, minute and hour, see utility.request_rates.
+    Unlike request-count/ these are sliding windows and are never reset.
+
+    Example Response:
+    ```
+    {
+        "second": {"requests": 12, "per_second": 12.0, "users": 9},
+        "minute": {"requests": 540, "per_second": 9.0, "users": 85},
+        "hour": {"requests": 28800, "per_second": 8.0, "users": 410}
+    }
+    ```
+    """
+
+    def get(self, request, *args, **kwargs):
+        return Response(request_rates.windows(), status=status.HTTP_200_OK)
+
+
+class PrometheusMetrics(APIView):
+    """
+    View serving the metrics of all workers in the Prometheus text format, for scraping.
+
+    - Per view: request latency, database queries and database time histograms.
+    - Per upstream host: call latency histogram, calls by outcome and retries.
+
+    p50/p99 per endpoint are derived from the histograms by Prometheus, e.g.
+    `histogram_quantile(0.99, sum by (le, view) (rate(http_request_duration_seconds_bucket[5m])))`.
+
+    Example Response:
+    ```
+    # HELP http_request_duration_seconds Time spent handling a request, by view.
+    # TYPE http_request_duration_seconds histogram
+    http_request_duration_seconds_bucket{le="0.005",view="movies"} 0
+    ...
+    http_request_duration_seconds_bucket{le="+Inf",view="movies"} 12
+    http_request_duration_seconds_sum{view="movies"} 0.84
+    http_request_duration_seconds_count{view="movies"} 12
+    ```
+    """
+
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
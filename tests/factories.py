@@ -26,7 +26,8 @@ class MovieFactory(factory.django.DjangoModelFactory):
 
     # Define movie fields with either static or dynamic data
 
-    uuid = uuid.uuid4()  # You can set a specific UUID or use the default one
+    # You can set a specific UUID or use the default one
+    uuid = factory.LazyFunction(uuid.uuid4)
     title = factory.Faker('sentence')
     description = factory.Faker('text')
     genres = factory.Faker('word')
@@ -35,11 +36,20 @@ class MovieFactory(factory.django.DjangoModelFactory):
 class CollectionFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Collection
+        skip_postgeneration_save = True
 
     # Define collection fields with either static or dynamic data
-    uuid = uuid.uuid4()
+    uuid = factory.LazyFunction(uuid.uuid4)
     title = factory.Faker ('sentence')
     description = factory.Faker ('text')
     user = factory.SubFactory(UserFactory)
-    movies = factory.SubFactory(MovieFactory)
+
+    @factory.post_generation
+    def movies(self, create, extracted, **kwargs):
+        # many-to-many can only be set once the collection is saved
+        if not create:
+            return
+        if extracted is None:
+            extracted = [MovieFactory()]
+        self.movies.add(*extracted)
 
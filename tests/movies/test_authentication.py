@@ -0,0 +1,43 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+@pytest.fixture
+def token_client(user_create):
+    client = APIClient()
+    token = RefreshToken.for_user(user_create).access_token
+    client.credentials(HTTP_AUTHORIZATION="Bearer %s" % token)
+    return client
+
+
+def user_queries(queries):
+    return [q for q in queries.captured_queries if '"auth_user"' in q["sql"]]
+
+
+@pytest.mark.django_db
+class TestCachedUserJWTAuthentication(object):
+    def test_user_read_from_cache(self, token_client, django_assert_max_num_queries):
+        with django_assert_max_num_queries(20) as first:
+            assert token_client.get(reverse("collection")).status_code == 200
+        with django_assert_max_num_queries(20) as second:
+            assert token_client.get(reverse("collection")).status_code == 200
+
+        assert len(user_queries(first)) == 1
+        assert user_queries(second) == []
+
+    def test_deactivated_user_refused(self, token_client, user_create):
+        token_client.get(reverse("collection"))
+
+        user_create.is_active = False
+        user_create.save()
+
+        assert token_client.get(reverse("collection")).status_code == 401
+
+    def test_deleted_user_refused(self, token_client, user_create):
+        token_client.get(reverse("collection"))
+
+        user_create.delete()
+
+        assert token_client.get(reverse("collection")).status_code == 401
@@ -0,0 +1,112 @@
+import pytest
+from unittest import mock
+from django.core.management import call_command
+from django.urls import reverse
+from movies.models import Movies, CatalogSyncCheckpoint
+from utility.catalog_sync import CatalogSync
+from utility.retry_mechanism import RetryStrategy
+
+URL = "https://example.com/movies/"
+
+
+def movie(uuid, title="title", genres="Drama"):
+    return {"uuid": uuid, "title": title, "description": "desc", "genres": genres}
+
+
+PAGES = {
+    URL: {
+        "count": 3,
+        "next": URL + "?page=2",
+        "data": [
+            movie("8e8d4b9e-2a59-4b8e-9d2a-000000000001"),
+            movie("8e8d4b9e-2a59-4b8e-9d2a-000000000002"),
+        ],
+    },
+    URL
+    + "?page=2": {
+        "count": 3,
+        "next": None,
+        "data": [movie("8e8d4b9e-2a59-4b8e-9d2a-000000000003")],
+    },
+}
+
+
+def fake_fetch(pages):
+    def fetch(url, **kwargs):
+        response = mock.Mock(status_code=200)
+        response.json.return_value = pages[url]
+        return response
+
+    return fetch
+
+
+@pytest.mark.django_db
+class TestCatalogSync(object):
+    def test_full_sync_follows_next_links(self):
+        with mock.patch.object(RetryStrategy, "fetch", side_effect=fake_fetch(PAGES)):
+            checkpoint = CatalogSync(URL, batch_size=1).run()
+
+        assert Movies.objects.count() == 3
+        assert checkpoint.completed
+        assert checkpoint.pages_synced == 2
+        assert checkpoint.next_url == URL + "?page=2"
+
+    def test_rerun_resumes_from_last_page_and_updates(self):
+        with mock.patch.object(RetryStrategy, "fetch", side_effect=fake_fetch(PAGES)):
+            CatalogSync(URL).run()
+
+        pages = dict(PAGES)
+        pages[URL + "?page=2"] = {
+            "count": 3,
+            "next": None,
+            "data": [movie("8e8d4b9e-2a59-4b8e-9d2a-000000000003", title="renamed")],
+        }
+        with mock.patch.object(
+            RetryStrategy, "fetch", side_effect=fake_fetch(pages)
+        ) as fetch:
+            CatalogSync(URL).run()
+
+        assert [call.args[0] for call in fetch.call_args_list] == [URL + "?page=2"]
+        assert Movies.objects.count() == 3
+        assert (
+            Movies.objects.get(uuid=pages[URL + "?page=2"]["data"][0]["uuid"]).title
+            == "renamed"
+        )
+
+    def test_interrupted_sync_keeps_checkpoint(self):
+        pages = {URL: PAGES[URL]}
+        with mock.patch.object(RetryStrategy, "fetch", side_effect=fake_fetch(pages)):
+            with pytest.raises(KeyError):
+                CatalogSync(URL).run()
+
+        checkpoint = CatalogSyncCheckpoint.objects.get()
+        assert not checkpoint.completed
+        assert checkpoint.next_url == URL + "?page=2"
+
+    def test_command(self, monkeypatch):
+        monkeypatch.setenv("MOVIE_API_URL", URL)
+        monkeypatch.setenv("API_CLIENT", "user")
+        monkeypatch.setenv("API_CLIENT_SECRET", "secret")
+        with mock.patch.object(RetryStrategy, "fetch", side_effect=fake_fetch(PAGES)):
+            call_command("sync_movies", "--full")
+
+        assert Movies.objects.count() == 3
+
+
+@pytest.mark.django_db
+class TestMovieListMirror(object):
+    def test_served_from_mirror(self, api_client, settings):
+        settings.MOVIE_LIST_SOURCE = "mirror"
+        settings.MOVIE_MIRROR_PAGE_SIZE = 2
+        with mock.patch.object(RetryStrategy, "fetch", side_effect=fake_fetch(PAGES)):
+            CatalogSync(URL).run()
+
+        with mock.patch.object(RetryStrategy, "fetch") as fetch:
+            response = api_client.get(reverse("movies"), {"page": 2})
+
+        fetch.assert_not_called()
+        assert response.status_code == 200
+        assert response.data["count"] == 3
+        assert response.data["next"] is None
+        assert response.data["previous"]
+        assert len(response.data["data"]) == 1
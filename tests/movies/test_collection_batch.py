@@ -0,0 +1,52 @@
+import uuid
+import pytest
+from django.urls import reverse
+from ..factories import CollectionFactory, MovieFactory, UserFactory
+
+
+@pytest.mark.django_db
+class TestCollectionBatch(object):
+    def get(self, api_client, uuids):
+        return api_client.get(
+            reverse("collection-batch"), {"uuids": ",".join(map(str, uuids))}
+        )
+
+    def test_returns_collections_in_requested_order(self, api_client, user_create):
+        first = CollectionFactory(user=user_create, movies=MovieFactory.create_batch(2))
+        second = CollectionFactory(user=user_create, movies=[MovieFactory()])
+
+        response = self.get(api_client, [second.uuid, first.uuid])
+
+        assert response.status_code == 200
+        collections = response.data["collections"]
+        assert [c["uuid"] for c in collections] == [str(second.uuid), str(first.uuid)]
+        assert [len(c["movies"]) for c in collections] == [1, 2]
+        assert response.data["not_found"] == []
+
+    def test_other_users_collections_not_found(self, api_client, user_create):
+        own = CollectionFactory(user=user_create)
+        other = CollectionFactory(user=UserFactory())
+        unknown = uuid.uuid4()
+
+        response = self.get(api_client, [own.uuid, other.uuid, unknown])
+
+        assert [c["uuid"] for c in response.data["collections"]] == [str(own.uuid)]
+        assert response.data["not_found"] == [str(other.uuid), str(unknown)]
+
+    def test_query_count_is_constant(
+        self, api_client, user_create, django_assert_num_queries
+    ):
+        collections = [
+            CollectionFactory(user=user_create, movies=MovieFactory.create_batch(3))
+            for _ in range(5)
+        ]
+
+        with django_assert_num_queries(2):
+            self.get(api_client, [c.uuid for c in collections])
+
+    def test_invalid_and_oversized_requests_rejected(self, api_client, settings):
+        settings.COLLECTION_BATCH_MAX_SIZE = 2
+
+        assert self.get(api_client, ["not-a-uuid"]).status_code == 400
+        assert self.get(api_client, []).status_code == 400
+        assert self.get(api_client, [uuid.uuid4() for _ in range(3)]).status_code == 400
@@ -0,0 +1,134 @@
+import json
+import uuid
+import pytest
+from django.urls import reverse
+from movies.models import Collection, Movies, UserGenreCount
+from utility.genre_histogram import GenreHistogram
+from ..factories import CollectionFactory, MovieFactory
+
+
+def collection_lines(n, movies_per_collection=2):
+    lines = []
+    for i in range(n):
+        movies = [
+            {
+                "uuid": str(uuid.uuid4()),
+                "title": "movie %d" % j,
+                "description": "description",
+                "genres": "Drama,Comedy",
+            }
+            for j in range(movies_per_collection)
+        ]
+        lines.append({"title": "c%d" % i, "description": "d", "movies": movies})
+    return lines
+
+
+def ndjson(lines):
+    return "".join(json.dumps(line) + "\n" for line in lines)
+
+
+@pytest.mark.django_db
+class TestCollectionImport(object):
+    def post(self, api_client, body, content_type="application/x-ndjson"):
+        return api_client.post(
+            reverse("collection-import"), data=body, content_type=content_type
+        )
+
+    def test_imports_ndjson_in_chunks(self, api_client, user_create, settings):
+        settings.COLLECTION_IMPORT_CHUNK_SIZE = 2
+        lines = collection_lines(5)
+        existing = MovieFactory(title="kept")
+        lines[0]["movies"].append(
+            {"uuid": str(existing.uuid), "title": "x", "description": "", "genres": ""}
+        )
+
+        response = self.post(api_client, ndjson(lines))
+
+        assert response.status_code == 201
+        assert response.data == {"collections": 5, "movies": 11, "errors": {}}
+        assert Collection.objects.filter(user=user_create).count() == 5
+        existing.refresh_from_db()
+        assert existing.title == "kept"
+        # bulk inserts keep the genre histogram in step.
+        assert GenreHistogram.top_favourite_genres(user_create, n=2) == "Comedy,Drama"
+        assert UserGenreCount.objects.get(user=user_create, genre="Drama").count == 10
+
+    def test_json_array_with_invalid_entries(self, api_client, user_create):
+        lines = collection_lines(2)
+        lines.insert(1, {"description": "no title"})
+
+        response = self.post(api_client, json.dumps(lines), "application/json")
+
+        assert response.data["collections"] == 2
+        assert list(response.data["errors"]) == ["1"]
+
+    def test_query_count_independent_of_collections(
+        self, api_client, settings, django_assert_max_num_queries
+    ):
+        settings.COLLECTION_IMPORT_CHUNK_SIZE = 100
+        with django_assert_max_num_queries(30) as small:
+            self.post(api_client, ndjson(collection_lines(1)))
+
+        with django_assert_max_num_queries(len(small.captured_queries)):
+            self.post(api_client, ndjson(collection_lines(50)))
+
+    def test_malformed_body(self, api_client):
+        response = self.post(api_client, '{"title": ')
+        assert response.status_code == 400
+        assert Collection.objects.count() == 0
+
+    def test_malformed_line_reports_partial_import(
+        self, api_client, user_create, settings
+    ):
+        settings.COLLECTION_IMPORT_CHUNK_SIZE = 2
+        body = ndjson(collection_lines(4, movies_per_collection=0)) + "{not json\n"
+
+        response = self.post(api_client, body)
+
+        assert response.status_code == 400
+        assert response.data[
+            "message"
+        ] == "Invalid JSON at line 5 (byte offset %d)." % (
+            len(body) - len("{not json\n")
+        )
+        assert response.data["collections"] == 4
+        assert Collection.objects.filter(user=user_create).count() == 4
+
+    def test_values_that_are_not_objects_reported(self, api_client, user_create):
+        lines = collection_lines(1)
+        body = json.dumps([1, lines[0], "x"])
+
+        response = self.post(api_client, body, "application/json")
+
+        assert response.status_code == 201
+        assert response.data["collections"] == 1
+        assert list(response.data["errors"]) == ["0", "2"]
+
+
+@pytest.mark.django_db
+class TestCollectionExport(object):
+    def test_streams_collections_as_ndjson(self, api_client, user_create):
+        movies = MovieFactory.create_batch(2)
+        collection = CollectionFactory(user=user_create, movies=movies)
+        CollectionFactory()  # another user's
+
+        response = api_client.get(reverse("collection-export"))
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert len(lines) == 1
+        record = json.loads(lines[0])
+        assert record["uuid"] == str(collection.uuid)
+        assert [m["uuid"] for m in record["movies"]] == [str(m.uuid) for m in movies]
+
+    def test_export_can_be_imported(self, api_client, user_create):
+        CollectionFactory.create_batch(3, user=user_create)
+        body = b"".join(api_client.get(reverse("collection-export")).streaming_content)
+
+        response = api_client.post(
+            reverse("collection-import"), data=body, content_type="application/x-ndjson"
+        )
+
+        assert response.data["collections"] == 3
+        assert Collection.objects.filter(user=user_create).count() == 6
+        assert Movies.objects.count() == 3
@@ -0,0 +1,220 @@
+import uuid
+import pytest
+from django.urls import reverse
+from movies.models import Collection, Movies
+from ..factories import MovieFactory
+
+
+def movie_payload(n):
+    return [
+        {
+            "uuid": str(uuid.uuid4()),
+            "title": "title %d" % i,
+            "description": "description",
+            "genres": "Drama,Comedy",
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.mark.django_db
+class TestCreateCollection(object):
+    def test_creates_movies_and_membership(self, api_client):
+        existing = MovieFactory(title="kept")
+        movies = movie_payload(2) + [
+            {
+                "uuid": str(existing.uuid),
+                "title": "ignored",
+                "description": "ignored",
+                "genres": "ignored",
+            }
+        ]
+
+        response = api_client.post(
+            reverse("collection"),
+            {"title": "t", "description": "d", "movies": movies},
+            format="json",
+        )
+
+        assert response.status_code == 201
+        collection = Collection.objects.get(uuid=response.data["collection_uuid"])
+        assert collection.movies.count() == 3
+        assert Movies.objects.count() == 3
+        existing.refresh_from_db()
+        assert existing.title == "kept"
+
+    def test_query_count_is_constant(self, api_client, django_assert_max_num_queries):
+        payload = {"title": "t", "description": "d", "movies": movie_payload(1)}
+        with django_assert_max_num_queries(20) as small:
+            api_client.post(reverse("collection"), payload, format="json")
+
+        payload["movies"] = movie_payload(50)
+        with django_assert_max_num_queries(len(small.captured_queries)):
+            api_client.post(reverse("collection"), payload, format="json")
+
+
+@pytest.mark.django_db
+class TestUpdateCollection(object):
+    def test_updates_movies_in_bulk(self, api_client, user_create, collection_factory):
+        movies = MovieFactory.create_batch(3)
+        collection = collection_factory(user=user_create, movies=movies)
+        payload = {
+            "title": "renamed",
+            "movies": [
+                {"uuid": str(movie.uuid), "title": "new %d" % i}
+                for i, movie in enumerate(movies)
+            ],
+        }
+
+        response = api_client.put(
+            reverse("collection-details", args=[collection.uuid]),
+            payload,
+            format="json",
+        )
+
+        assert response.status_code == 200
+        collection.refresh_from_db()
+        assert collection.title == "renamed"
+        assert sorted(collection.movies.values_list("title", flat=True)) == [
+            "new 0",
+            "new 1",
+            "new 2",
+        ]
+
+    def test_reports_all_failures_and_writes_nothing(
+        self, api_client, user_create, collection_factory
+    ):
+        member = MovieFactory(title="member")
+        outsider = MovieFactory()
+        collection = collection_factory(user=user_create, movies=[member])
+        unknown = str(uuid.uuid4())
+        payload = {
+            "title": "renamed",
+            "movies": [
+                {"uuid": str(member.uuid), "title": "changed"},
+                {"uuid": str(outsider.uuid), "title": "changed"},
+                {"uuid": unknown, "title": "changed"},
+            ],
+        }
+
+        response = api_client.put(
+            reverse("collection-details", args=[collection.uuid]),
+            payload,
+            format="json",
+        )
+
+        assert response.status_code == 400
+        assert response.data["missing"] == [unknown]
+        assert response.data["not_in_collection"] == [str(outsider.uuid)]
+        member.refresh_from_db()
+        collection.refresh_from_db()
+        assert member.title == "member"
+        assert collection.title != "renamed"
+
+    @pytest.mark.parametrize(
+        "movies, errors",
+        [
+            ("x", {"movies": ["Expected a list."]}),
+            (
+                ["x", 1],
+                {"0": ["Expected a movie object."], "1": ["Expected a movie object."]},
+            ),
+            (
+                [{"title": "t"}, {"uuid": None}, {"uuid": "garbage"}],
+                {
+                    "0": {"uuid": ["This field is required."]},
+                    "1": {"uuid": ["Must be a valid UUID."]},
+                    "2": {"uuid": ["Must be a valid UUID."]},
+                },
+            ),
+        ],
+    )
+    def test_malformed_movies_rejected(
+        self, api_client, user_create, collection_factory, movies, errors
+    ):
+        collection = collection_factory(user=user_create)
+
+        response = api_client.put(
+            reverse("collection-details", args=[collection.uuid]),
+            {"title": "renamed", "movies": movies},
+            format="json",
+        )
+
+        assert response.status_code == 400
+        assert response.data["errors"] == errors
+        assert "missing" not in response.data
+        collection.refresh_from_db()
+        assert collection.title != "renamed"
+
+
+@pytest.mark.django_db
+class TestCollectionMoviesDelta(object):
+    def test_add_and_remove(self, api_client, user_create, collection_factory):
+        kept, removed, added = MovieFactory.create_batch(3)
+        collection = collection_factory(user=user_create, movies=[kept, removed])
+
+        response = api_client.patch(
+            reverse("collection-movies", args=[collection.uuid]),
+            {"add": [str(added.uuid)], "remove": [str(removed.uuid)]},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        assert set(collection.movies.all()) == {kept, added}
+
+    def test_unknown_movie_rejected(self, api_client, user_create, collection_factory):
+        member = MovieFactory()
+        collection = collection_factory(user=user_create, movies=[member])
+        unknown = str(uuid.uuid4())
+
+        response = api_client.patch(
+            reverse("collection-movies", args=[collection.uuid]),
+            {"add": [unknown], "remove": [str(member.uuid)]},
+            format="json",
+        )
+
+        assert response.status_code == 400
+        assert response.data["missing"] == [unknown]
+        assert list(collection.movies.all()) == [member]
+
+    def test_other_users_collection_not_found(self, api_client, collection_factory):
+        collection = collection_factory()
+
+        response = api_client.patch(
+            reverse("collection-movies", args=[collection.uuid]),
+            {"remove": [str(collection.movies.get().uuid)]},
+            format="json",
+        )
+
+        assert response.status_code == 404
+        assert collection.movies.count() == 1
+
+
+@pytest.mark.django_db
+class TestCollectionPagination(object):
+    def test_collection_list_cursor(self, api_client, user_create, collection_factory):
+        collection_factory.create_batch(3, user=user_create)
+
+        first = api_client.get(reverse("collection"), {"page_size": 2})
+        second = api_client.get(first.data["data"]["next"])
+
+        assert len(first.data["data"]["collection"]) == 2
+        assert len(second.data["data"]["collection"]) == 1
+        assert second.data["data"]["next"] is None
+        assert "cursor=" in first.data["data"]["next"]
+
+    def test_collection_movies_cursor(
+        self, api_client, user_create, collection_factory, settings
+    ):
+        settings.COLLECTION_PAGE_SIZE = 2
+        movies = MovieFactory.create_batch(3)
+        collection = collection_factory(user=user_create, movies=movies)
+
+        first = api_client.get(reverse("collection-details", args=[collection.uuid]))
+        second = api_client.get(first.data["next"])
+
+        uuids = [
+            movie["uuid"] for movie in first.data["movies"] + second.data["movies"]
+        ]
+        assert uuids == [str(movie.uuid) for movie in movies]
+        assert second.data["previous"]
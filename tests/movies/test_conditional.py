@@ -0,0 +1,98 @@
+import pytest
+from django.urls import reverse
+from movies.models import Collection
+from tests.factories import CollectionFactory, MovieFactory
+
+
+@pytest.mark.django_db
+class TestCollectionConditionalGet(object):
+    def test_collection_list_not_modified(
+        self, api_client, user_create, django_assert_num_queries
+    ):
+        CollectionFactory(user=user_create)
+        etag = api_client.get(reverse("collection"))["ETag"]
+
+        # the version is one aggregate over the collections, no movie row is read.
+        with django_assert_num_queries(1):
+            response = api_client.get(reverse("collection"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+    def test_collection_list_etag_changes_with_membership(
+        self, api_client, user_create
+    ):
+        collection = CollectionFactory(user=user_create)
+        etag = api_client.get(reverse("collection"))["ETag"]
+
+        collection.movies.add(MovieFactory())
+
+        response = api_client.get(reverse("collection"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_detail_etag_changes_with_movie_edit(self, api_client, user_create):
+        movie = MovieFactory()
+        collection = CollectionFactory(user=user_create, movies=[movie])
+        url = reverse("collection-details", args=[collection.uuid])
+        etag = api_client.get(url)["ETag"]
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        movie.title = "new"
+        movie.save()
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.data["movies"][0]["title"] == "new"
+
+    def test_etag_depends_on_query_string(self, api_client, user_create):
+        CollectionFactory(user=user_create)
+        first = api_client.get(reverse("collection"))["ETag"]
+        second = api_client.get(reverse("collection"), {"page_size": 1})["ETag"]
+        assert first != second
+
+    def test_collection_list_modified_after_delete(self, api_client, user_create):
+        CollectionFactory(user=user_create)
+        latest = CollectionFactory(user=user_create)
+        response = api_client.get(reverse("collection"))
+        assert "Last-Modified" not in response
+
+        latest.delete()
+
+        response = api_client.get(
+            reverse("collection"),
+            HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT",
+        )
+        assert response.status_code == 200
+        assert len(response.data["data"]["collection"]) == 1
+
+    def test_detail_malformed_uuid_not_found(self, api_client):
+        response = api_client.get(reverse("collection-details", args=["not-a-uuid"]))
+        assert response.status_code == 404
+
+    def test_save_keeps_bumped_revision(self, user_create):
+        collection = CollectionFactory(user=user_create)
+        stale = Collection.objects.get(pk=collection.pk)
+        collection.movies.add(MovieFactory())
+        revision = Collection.objects.get(pk=collection.pk).revision
+
+        stale.title = "renamed"
+        stale.save()
+
+        saved = Collection.objects.get(pk=collection.pk)
+        assert (saved.title, saved.revision) == ("renamed", revision)
+
+    def test_detail_etag_changes_with_movie_and_title_update(
+        self, api_client, user_create
+    ):
+        movie = MovieFactory()
+        collection = CollectionFactory(user=user_create, movies=[movie])
+        url = reverse("collection-details", args=[collection.uuid])
+        revision = Collection.objects.get(pk=collection.pk).revision
+
+        api_client.put(
+            url,
+            {"title": "new", "movies": [{"uuid": str(movie.uuid), "title": "new"}]},
+            format="json",
+        )
+
+        assert Collection.objects.get(pk=collection.pk).revision > revision
@@ -0,0 +1,56 @@
+import pytest
+from django.urls import reverse
+from movies.models import Genre, Movies
+from movies.serializers import MovieSerializer
+from ..factories import CollectionFactory, MovieFactory
+
+
+def tags(movie):
+    return set(movie.genre_tags.values_list("name", flat=True))
+
+
+@pytest.mark.django_db
+class TestGenres(object):
+    def test_split_names(self):
+        assert Genre.split_names("Drama, Action,,") == ["Drama", "Action"]
+        assert Genre.split_names("") == []
+
+    def test_tags_follow_genres_string(self):
+        movie = MovieFactory(genres="Drama,Action")
+        assert tags(movie) == {"Drama", "Action"}
+
+        movie.genres = "Action,Horror"
+        movie.save()
+        assert tags(movie) == {"Action", "Horror"}
+        assert Genre.objects.filter(name="Drama").exists()
+
+    def test_sync_movies_for_bulk_writes(self, django_assert_max_num_queries):
+        movies = Movies.objects.bulk_create(
+            [
+                Movies(title=str(i), description="d", genres="Drama,Comedy")
+                for i in range(20)
+            ]
+        )
+        ids = Movies.objects.values_list("id", flat=True)
+
+        with django_assert_max_num_queries(5):
+            Genre.objects.sync_movies(ids)
+
+        assert Genre.objects.get(name="Drama").movies.count() == len(movies)
+
+    def test_wire_format_unchanged(self):
+        movie = MovieFactory(genres="Drama,Action")
+        assert MovieSerializer(movie).data["genres"] == "Drama,Action"
+
+    def test_filter_collection_movies_by_genre(self, api_client, user_create):
+        drama = MovieFactory(genres="Drama")
+        comedy = MovieFactory(genres="Comedy")
+        collection = CollectionFactory(user=user_create, movies=[drama, comedy])
+
+        response = api_client.get(
+            reverse("collection-details", args=[collection.uuid]), {"genre": "Comedy"}
+        )
+
+        assert [movie["uuid"] for movie in response.data["movies"]] == [
+            str(comedy.uuid)
+        ]
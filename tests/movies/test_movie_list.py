@@ -0,0 +1,107 @@
+import pytest
+from unittest import mock
+from django.urls import reverse
+from rest_framework.test import APIClient
+from utility.retry_mechanism import RetryStrategy
+
+
+@pytest.fixture
+def movie_api(monkeypatch):
+    monkeypatch.setenv("MOVIE_API_URL", "https://example.com/movies/")
+    monkeypatch.setenv("API_CLIENT", "user")
+    monkeypatch.setenv("API_CLIENT_SECRET", "secret")
+
+
+@pytest.mark.django_db
+class TestMovieListStream(object):
+    def test_body_relayed_without_parsing(self, api_client, movie_api, settings):
+        settings.MOVIE_LIST_SOURCE = "stream"
+        upstream = mock.Mock(
+            status_code=200, headers={"Content-Type": "application/json"}
+        )
+        upstream.iter_content.return_value = iter([b'{"count": 1, ', b'"data": []}'])
+
+        with mock.patch.object(RetryStrategy, "fetch", return_value=upstream) as fetch:
+            response = api_client.get(reverse("movies"), {"page": 3})
+            body = b"".join(response.streaming_content)
+
+        assert fetch.call_args.kwargs["stream"] is True
+        assert fetch.call_args.kwargs["params"] == {"page": "3"}
+        assert body == b'{"count": 1, "data": []}'
+        upstream.json.assert_not_called()
+        upstream.close.assert_called_once()
+
+    def test_failure_not_streamed(self, api_client, movie_api, settings):
+        settings.MOVIE_LIST_SOURCE = "stream"
+        upstream = mock.Mock(status_code=502, headers={})
+
+        with mock.patch.object(RetryStrategy, "fetch", return_value=upstream):
+            response = api_client.get(reverse("movies"))
+
+        assert response.data == RetryStrategy.failure_response(502)
+        upstream.close.assert_called_once()
+
+    def test_conditional_request_forwarded(self, api_client, movie_api, settings):
+        settings.MOVIE_LIST_SOURCE = "stream"
+        upstream = mock.Mock(status_code=304, headers={"ETag": '"v1"'})
+
+        with mock.patch.object(RetryStrategy, "fetch", return_value=upstream) as fetch:
+            response = api_client.get(reverse("movies"), HTTP_IF_NONE_MATCH='"v1"')
+
+        assert fetch.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+        assert response.status_code == 304
+        assert response["ETag"] == '"v1"'
+        upstream.close.assert_called_once()
+
+
+@pytest.mark.django_db
+class TestMovieListConditional(object):
+    def test_not_modified_from_cached_validators(self, api_client, movie_api, settings):
+        settings.MOVIE_LIST_SOURCE = "upstream"
+        settings.MOVIE_API_CACHE_TTL = 60
+        upstream = mock.Mock(status_code=200, headers={"ETag": '"v1"'})
+        upstream.json.return_value = {"count": 1}
+
+        with mock.patch.object(RetryStrategy, "fetch", return_value=upstream) as fetch:
+            response = api_client.get(reverse("movies"))
+            assert response["ETag"] == '"v1"'
+
+            response = api_client.get(reverse("movies"), HTTP_IF_NONE_MATCH='"v1"')
+
+        assert response.status_code == 304
+        assert fetch.call_count == 1
+
+
+@pytest.mark.django_db
+class TestMovieListThrottle(object):
+    @pytest.mark.parametrize("backend", ["cache", "redis"])
+    def test_user_throttled_with_retry_after(
+        self, api_client, settings, request, backend
+    ):
+        if backend == "redis":
+            request.getfixturevalue("redis_cache")
+        settings.MOVIE_LIST_SOURCE = "mirror"
+        settings.MOVIE_LIST_USER_THROTTLE_RATE = "1/m"
+        settings.MOVIE_LIST_USER_THROTTLE_BURST = 2
+
+        statuses = [api_client.get(reverse("movies")).status_code for _ in range(3)]
+
+        assert statuses == [200, 200, 429]
+        response = api_client.get(reverse("movies"))
+        assert 0 < int(response["Retry-After"]) <= 60
+
+    def test_throttled_user_does_not_drain_global_bucket(
+        self, api_client, settings, user_factory
+    ):
+        settings.MOVIE_LIST_SOURCE = "mirror"
+        settings.MOVIE_LIST_USER_THROTTLE_RATE = "1/m"
+        settings.MOVIE_LIST_USER_THROTTLE_BURST = 1
+        settings.MOVIE_LIST_GLOBAL_THROTTLE_RATE = "1/m"
+        settings.MOVIE_LIST_GLOBAL_THROTTLE_BURST = 2
+
+        for _ in range(5):
+            api_client.get(reverse("movies"))
+
+        other = APIClient()
+        other.force_authenticate(user=user_factory())
+        assert other.get(reverse("movies")).status_code == 200
@@ -0,0 +1,33 @@
+import pytest
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+class TestRequestCount(object):
+    def test_requests_counted_by_route_and_status_class(self, api_client):
+        api_client.get(reverse("collection"))
+        api_client.get(reverse("collection"))
+        api_client.get("/no-such-page/")
+
+        response = api_client.get(reverse("request-count"))
+
+        assert response.data["requests"] == 3
+        assert response.data["routes"] == {
+            "collection": {"2xx": 2},
+            "unmatched": {"4xx": 1},
+        }
+
+    def test_reset(self, api_client):
+        api_client.get(reverse("collection"))
+
+        api_client.post(reverse("request-count-reset"))
+
+        # the reset request itself is counted after the reset.
+        assert api_client.get(reverse("request-count")).data["requests"] == 1
+
+    def test_rates_endpoint(self, api_client, user_create):
+        response = api_client.get(reverse("request-count-rates"))
+
+        assert response.status_code == 200
+        assert set(response.data) == {"second", "minute", "hour"}
+        assert set(response.data["minute"]) == {"requests", "per_second", "users"}
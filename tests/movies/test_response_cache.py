@@ -0,0 +1,81 @@
+import pytest
+from django.urls import reverse
+from utility.response_cache import ResponseCache
+from ..factories import CollectionFactory, MovieFactory
+
+
+@pytest.mark.django_db
+class TestResponseCache(object):
+    def test_collection_list_cached_until_write(
+        self, api_client, user_create, django_assert_num_queries
+    ):
+        CollectionFactory(user=user_create, title="first")
+        api_client.get(reverse("collection"))
+
+        # only the version of the collections is read, to compute the ETag.
+        with django_assert_num_queries(1):
+            response = api_client.get(reverse("collection"))
+        assert response.data["data"]["collection"][0]["title"] == "first"
+
+        CollectionFactory(user=user_create, title="second")
+        response = api_client.get(reverse("collection"))
+        assert len(response.data["data"]["collection"]) == 2
+
+    def test_detail_invalidated_by_movie_edit(self, api_client, user_create):
+        movie = MovieFactory(title="old")
+        collection = CollectionFactory(user=user_create, movies=[movie])
+        url = reverse("collection-details", args=[collection.uuid])
+        api_client.get(url)
+
+        movie.title = "new"
+        movie.save()
+
+        assert api_client.get(url).data["movies"][0]["title"] == "new"
+
+    def test_detail_invalidated_by_bulk_update(self, api_client, user_create):
+        movie = MovieFactory(title="old")
+        collection = CollectionFactory(user=user_create, movies=[movie])
+        other = CollectionFactory(user=user_create, movies=[movie])
+        other_url = reverse("collection-details", args=[other.uuid])
+        api_client.get(other_url)
+
+        api_client.put(
+            reverse("collection-details", args=[collection.uuid]),
+            {"movies": [{"uuid": str(movie.uuid), "title": "new"}]},
+            format="json",
+        )
+
+        assert api_client.get(other_url).data["movies"][0]["title"] == "new"
+
+    def test_upper_case_uuid_invalidated_by_rename(self, api_client, user_create):
+        collection = CollectionFactory(user=user_create, title="old")
+        url = reverse("collection-details", args=[str(collection.uuid).upper()])
+        api_client.get(url)
+
+        api_client.put(
+            reverse("collection-details", args=[collection.uuid]),
+            {"title": "new"},
+            format="json",
+        )
+
+        assert api_client.get(url).data["title"] == "new"
+
+    def test_detail_invalidated_by_membership_change(self, api_client, user_create):
+        kept, removed = MovieFactory.create_batch(2)
+        collection = CollectionFactory(user=user_create, movies=[kept, removed])
+        url = reverse("collection-details", args=[collection.uuid])
+        api_client.get(url)
+
+        removed.collections.remove(collection)
+
+        assert len(api_client.get(url).data["movies"]) == 1
+
+    def test_hits_and_misses_counted(self, api_client, user_create):
+        api_client.get(reverse("collection"))
+        api_client.get(reverse("collection"))
+
+        response = api_client.get(reverse("request-count"))
+        assert response.data["response_cache"] == {"hits": 1, "misses": 1}
+
+        api_client.post(reverse("request-count-reset"))
+        assert ResponseCache.stats() == {"hits": 0, "misses": 0}
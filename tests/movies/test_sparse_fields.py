@@ -0,0 +1,80 @@
+import pytest
+from django.urls import reverse
+from movies.models import Collection, Movies
+from movies.serializers import (
+    FastCollectionSerializer,
+    FastMovieSerializer,
+    GetCollectionSerializer,
+    MovieSerializer,
+)
+from ..factories import CollectionFactory, MovieFactory
+
+
+@pytest.mark.django_db
+class TestFastSerializers(object):
+    def test_default_output_matches_model_serializers(self, user_create):
+        CollectionFactory.create_batch(2, user=user_create, movies=[MovieFactory()])
+
+        movies = Movies.objects.order_by("id")
+        assert (
+            FastMovieSerializer.serialize(
+                FastMovieSerializer.values(movies, FastMovieSerializer.fields),
+                FastMovieSerializer.fields,
+            )
+            == MovieSerializer(movies, many=True).data
+        )
+
+        collections = Collection.objects.order_by("id")
+        assert (
+            FastCollectionSerializer.serialize(
+                FastCollectionSerializer.values(
+                    collections, FastCollectionSerializer.fields
+                ),
+                FastCollectionSerializer.fields,
+            )
+            == GetCollectionSerializer(collections, many=True).data
+        )
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets(object):
+    def test_detail_only_selects_requested_fields(
+        self, api_client, user_create, django_assert_max_num_queries
+    ):
+        collection = CollectionFactory(user=user_create, movies=[MovieFactory()])
+        url = reverse("collection-details", args=[collection.uuid])
+
+        with django_assert_max_num_queries(10) as queries:
+            response = api_client.get(url, {"fields": "title,uuid"})
+
+        assert list(response.data["movies"][0]) == ["uuid", "title"]
+        movie_query = queries.captured_queries[-1]["sql"]
+        assert '"movies_movies"."title"' in movie_query
+        assert '"movies_movies"."genres"' not in movie_query
+
+    def test_collection_list_fields(self, api_client, user_create):
+        CollectionFactory(user=user_create)
+
+        response = api_client.get(reverse("collection"), {"fields": "uuid"})
+
+        assert list(response.data["data"]["collection"][0]) == ["uuid"]
+
+    def test_unknown_field_rejected(self, api_client, user_create):
+        collection = CollectionFactory(user=user_create)
+        url = reverse("collection-details", args=[collection.uuid])
+
+        response = api_client.get(url, {"fields": "title,secret"})
+
+        assert response.status_code == 400
+
+    def test_empty_field_names_ignored(self, api_client, user_create):
+        CollectionFactory(user=user_create)
+
+        response = api_client.get(reverse("collection"), {"fields": " ,"})
+        assert response.status_code == 200
+        assert list(response.data["data"]["collection"][0]) == list(
+            FastCollectionSerializer.fields
+        )
+
+        response = api_client.get(reverse("collection"), {"fields": ",uuid,"})
+        assert list(response.data["data"]["collection"][0]) == ["uuid"]
@@ -0,0 +1,68 @@
+from unittest import mock
+import pytest
+from django.contrib.auth import hashers
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.mark.django_db
+class TestTokens(object):
+    def test_register_hashes_password_once(self, client):
+        with mock.patch.object(
+            hashers, "check_password", wraps=hashers.check_password
+        ) as check_password:
+            response = client.post(
+                reverse("register"),
+                {"username": "new", "password": "s3cret-pass"},
+                format="json",
+            )
+
+        assert response.status_code == 201
+        assert {"access_token", "refresh_token"} <= set(response.data)
+        check_password.assert_not_called()
+
+    def test_login_then_refresh(self, client):
+        client.post(
+            reverse("register"), {"username": "new", "password": "pw"}, format="json"
+        )
+        tokens = client.post(
+            reverse("login"), {"username": "new", "password": "pw"}, format="json"
+        ).data
+
+        response = client.post(
+            reverse("token-refresh"),
+            {"refresh_token": tokens["refresh_token"]},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        client.credentials(
+            HTTP_AUTHORIZATION="Bearer %s" % response.data["access_token"]
+        )
+        assert client.get(reverse("collection")).status_code == 200
+
+    def test_refresh_rejects_invalid_tokens(self, client, user_create):
+        url = reverse("token-refresh")
+
+        assert client.post(url, {}, format="json").status_code == 400
+        # an access token can't be used as a refresh token.
+        response = client.post(
+            url, {"refresh_token": user_create.access_token}, format="json"
+        )
+        assert response.status_code == 401
+
+    def test_refresh_refused_for_inactive_user(self, client, user_create):
+        refresh = str(RefreshToken.for_user(user_create))
+        user_create.is_active = False
+        user_create.save()
+
+        response = client.post(
+            reverse("token-refresh"), {"refresh_token": refresh}, format="json"
+        )
+        assert response.status_code == 401
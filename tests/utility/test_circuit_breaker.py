@@ -0,0 +1,108 @@
+import pytest
+import requests
+from unittest import mock
+from django.core.cache import cache
+from utility.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    circuit_state_changed,
+)
+from utility.retry_mechanism import RetryStrategy
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker("example.com", failure_threshold=2, cooldown=30)
+
+
+class TestCircuitBreaker(object):
+    def test_opens_after_threshold(self, breaker):
+        breaker.record_failure()
+        assert breaker.allow_request()
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+        assert 0 < breaker.retry_after() <= 30
+
+    def test_success_resets_failures(self, breaker):
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failure_window_expiring_before_incr(self, breaker):
+        breaker.record_failure()
+        incr = cache.incr
+
+        def expire_then_incr(key, *args, **kwargs):
+            # the window runs out between the add and the incr.
+            cache.delete(key)
+            mocked.side_effect = incr
+            return incr(key, *args, **kwargs)
+
+        with mock.patch.object(cache, "incr", side_effect=expire_then_incr) as mocked:
+            breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert cache.get(breaker._key("failures")) == 1
+
+    def test_single_probe_after_cooldown(self, breaker):
+        breaker.record_failure()
+        breaker.record_failure()
+
+        with mock.patch("utility.circuit_breaker.time.time", return_value=2e10):
+            assert breaker.allow_request()
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            assert not breaker.allow_request()
+
+            breaker.record_failure()
+            assert breaker.state == CircuitBreaker.OPEN
+
+    def test_probe_success_closes(self, breaker):
+        breaker.record_failure()
+        breaker.record_failure()
+        with mock.patch("utility.circuit_breaker.time.time", return_value=2e10):
+            breaker.allow_request()
+        breaker.record_success()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.status()["transitions"] == {
+            "closed": 1,
+            "open": 1,
+            "half_open": 1,
+        }
+
+    def test_transitions_are_signalled(self, breaker):
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append((kwargs["old_state"], kwargs["new_state"]))
+
+        circuit_state_changed.connect(receiver)
+        try:
+            breaker.record_failure()
+            breaker.record_failure()
+        finally:
+            circuit_state_changed.disconnect(receiver)
+
+        assert received == [("closed", "open")]
+
+
+class TestRetryStrategyBreaker(object):
+    def test_fails_fast_when_open(self, settings):
+        settings.MOVIE_API_BREAKER_FAILURE_THRESHOLD = 1
+        url = "https://example.com/movies/"
+        session = RetryStrategy.get_session()
+
+        with mock.patch.object(
+            session, "get", side_effect=requests.exceptions.ConnectionError
+        ) as session_get:
+            assert RetryStrategy.retry_mechanism(url)["status_code"] == 503
+            data = RetryStrategy.retry_mechanism(url)
+            with pytest.raises(CircuitOpenError):
+                RetryStrategy.fetch(url)
+
+        assert session_get.call_count == 1
+        assert data["degraded"] is True
@@ -0,0 +1,42 @@
+import io
+import pytest
+from utility.collection_import import CollectionImport, CollectionImportError
+
+
+class SlowStream(io.BytesIO):
+    # hands out a few bytes at a time, like a body still being received.
+    def read(self, size=-1):
+        return super().read(min(size, 7))
+
+
+class TestParse(object):
+    def test_ndjson_and_json_array(self):
+        ndjson = b'{"title": "a"}\n{"title": "b"}\n'
+        array = b'[{"title": "a"},\n {"title": "b"}]'
+
+        for body in (ndjson, array):
+            assert list(CollectionImport.parse(SlowStream(body))) == [
+                {"title": "a"},
+                {"title": "b"},
+            ]
+
+    def test_multibyte_characters_split_across_reads(self):
+        body = '{"title": "Amélie éé"}'.encode()
+        assert list(CollectionImport.parse(SlowStream(body))) == [
+            {"title": "Amélie éé"}
+        ]
+
+    def test_empty_body(self):
+        assert list(CollectionImport.parse(None)) == []
+        assert list(CollectionImport.parse(io.BytesIO(b"[]"))) == []
+
+    @pytest.mark.parametrize("body", [b'{"title": "a"', b"not json"])
+    def test_invalid_body(self, body):
+        with pytest.raises(CollectionImportError):
+            list(CollectionImport.parse(io.BytesIO(body)))
+
+    def test_error_position_in_body(self):
+        body = '{"title": "é"}\n{"title": "b"}\n{not json\n'.encode()
+        with pytest.raises(CollectionImportError) as exc:
+            list(CollectionImport.parse(SlowStream(body)))
+        assert str(exc.value) == "Invalid JSON at line 3 (byte offset 31)."
@@ -0,0 +1,149 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from movies.models import Movies
+from tests.factories import MovieFactory
+from utility.db_router import PrimaryReplicaRouter, ReadYourWrites
+
+
+@pytest.fixture
+def replica(settings):
+    settings.DATABASES = dict(
+        settings.DATABASES,
+        replica={
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": "replica.sqlite3",
+            "TEST": {"MIRROR": "default"},
+        },
+    )
+    ReadYourWrites.start()
+    yield
+    ReadYourWrites.start()
+
+
+@pytest.fixture
+def separate_replica(settings, tmp_path):
+    # a replica that is not a mirror: writes to the primary never show up in it.
+    replica = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": str(tmp_path / "replica.sqlite3"),
+    }
+    settings.DATABASES = dict(settings.DATABASES, replica=replica)
+    connections.settings["replica"] = connections.configure_settings(
+        {"default": connections.settings["default"], "replica": replica}
+    )["replica"]
+    call_command("migrate", database="replica", verbosity=0)
+    ReadYourWrites.start()
+    yield
+    ReadYourWrites.start()
+    connections["replica"].close()
+    del connections["replica"]
+    del connections.settings["replica"]
+
+
+class TestPrimaryReplicaRouter(object):
+    def test_without_replica_reads_primary(self):
+        ReadYourWrites.start()
+        assert Movies.objects.all().db == "default"
+
+    def test_reads_go_to_replica(self, replica):
+        assert Movies.objects.all().db == "replica"
+        assert User.objects.all().db == "default"
+
+    def test_reads_after_write_go_to_primary(self, replica):
+        assert PrimaryReplicaRouter().db_for_write(Movies) == "default"
+        assert Movies.objects.all().db == "default"
+
+    # not wrapped in the test case transaction, which would keep every read on the primary.
+    @pytest.mark.django_db(transaction=True)
+    def test_reads_in_transaction_go_to_primary(self, replica):
+        with transaction.atomic():
+            assert Movies.objects.all().db == "default"
+
+
+class TestReadYourWrites(object):
+    def test_user_pinned_after_write(self, replica):
+        PrimaryReplicaRouter().db_for_write(Movies)
+        ReadYourWrites.finish(42)
+        assert cache.get(ReadYourWrites.make_key(42)) == 1
+
+        ReadYourWrites.start()
+        assert not ReadYourWrites.is_pinned()
+        ReadYourWrites.pin_user(7)
+        assert Movies.objects.all().db == "replica"
+        ReadYourWrites.pin_user(42)
+        assert Movies.objects.all().db == "default"
+
+    def test_read_only_request_not_pinned(self, replica):
+        ReadYourWrites.finish(42)
+        assert cache.get(ReadYourWrites.make_key(42)) is None
+
+
+# not wrapped in the test case transaction, which would keep every read on the primary.
+@pytest.mark.django_db(transaction=True)
+class TestSeparateReplica(object):
+    def test_reads_from_replica_unless_request_wrote(self, separate_replica):
+        movie = MovieFactory()
+        assert Movies.objects.filter(pk=movie.pk).exists()
+
+        # the next request reads from the replica, which never got the write.
+        ReadYourWrites.start()
+        assert not Movies.objects.filter(pk=movie.pk).exists()
+        assert Movies.objects.using("default").filter(pk=movie.pk).exists()
+
+    def test_user_pinned_to_primary_after_write(self, separate_replica, user_create):
+        client = APIClient()
+        token = RefreshToken.for_user(user_create).access_token
+        client.credentials(HTTP_AUTHORIZATION="Bearer %s" % token)
+
+        response = client.post(
+            reverse("collection"),
+            {"title": "t", "description": "d", "movies": []},
+            format="json",
+        )
+        assert response.status_code == 201
+        url = reverse("collection-details", args=[response.data["collection_uuid"]])
+
+        assert client.get(url).status_code == 200
+
+        # the collection list fills the response cache, it is read from the primary.
+        cache.delete(ReadYourWrites.make_key(user_create.pk))
+        response = client.get(reverse("collection"))
+        assert len(response.data["data"]["collection"]) == 1
+
+    def test_cached_responses_read_from_primary(
+        self, separate_replica, user_create, user_factory
+    ):
+        owner = APIClient()
+        token = RefreshToken.for_user(user_create).access_token
+        owner.credentials(HTTP_AUTHORIZATION="Bearer %s" % token)
+        response = owner.post(
+            reverse("collection"),
+            {"title": "t", "description": "d", "movies": []},
+            format="json",
+        )
+        url = reverse("collection-details", args=[response.data["collection_uuid"]])
+        assert owner.patch(url, {"title": "new"}, format="json").status_code == 200
+
+        # another user, not pinned: the replica never got the collection.
+        other = APIClient()
+        token = RefreshToken.for_user(user_factory()).access_token
+        other.credentials(HTTP_AUTHORIZATION="Bearer %s" % token)
+        for _ in range(2):
+            response = other.get(url)
+            assert response.status_code == 200
+            assert response.data["title"] == "new"
+
+    def test_primary_block(self, separate_replica):
+        with ReadYourWrites.primary():
+            assert Movies.objects.all().db == "default"
+        assert Movies.objects.all().db == "replica"
+
+        with ReadYourWrites.primary():
+            PrimaryReplicaRouter().db_for_write(Movies)
+        assert Movies.objects.all().db == "default"
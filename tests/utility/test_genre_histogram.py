@@ -0,0 +1,83 @@
+import pytest
+from django.urls import reverse
+from movies.models import UserGenreCount
+from utility.genre_histogram import GenreHistogram
+from utility.movie_helper import TopFavouriteGenres
+from ..factories import CollectionFactory, MovieFactory
+
+
+def histogram(user):
+    return dict(
+        UserGenreCount.objects.filter(user=user, count__gt=0).values_list(
+            "genre", "count"
+        )
+    )
+
+
+@pytest.mark.django_db
+class TestGenreHistogram(object):
+    def test_counts_follow_membership(self, user_create):
+        drama = MovieFactory(genres="Drama,Action")
+        comedy = MovieFactory(genres="Comedy,Drama")
+        first = CollectionFactory(user=user_create, movies=[drama, comedy])
+        CollectionFactory(user=user_create, movies=[drama])
+
+        assert histogram(user_create) == {"Drama": 3, "Action": 2, "Comedy": 1}
+
+        first.movies.remove(drama)
+        assert histogram(user_create) == {"Drama": 2, "Action": 1, "Comedy": 1}
+
+        first.delete()
+        assert histogram(user_create) == {"Drama": 1, "Action": 1}
+
+    def test_counts_follow_genre_edits(self, user_create):
+        movie = MovieFactory(genres="Drama")
+        CollectionFactory(user=user_create, movies=[movie])
+
+        movie.genres = "Horror,Drama"
+        movie.save()
+
+        assert histogram(user_create) == {"Drama": 1, "Horror": 1}
+
+    def test_clear_and_reverse_side(self, user_create):
+        movie = MovieFactory(genres="Drama")
+        collection = CollectionFactory(user=user_create, movies=[])
+
+        movie.collections.add(collection)
+        assert histogram(user_create) == {"Drama": 1}
+
+        collection.movies.clear()
+        assert histogram(user_create) == {}
+
+    def test_top_genres_match_python_implementation(self, user_create):
+        movies = [
+            MovieFactory(genres=genres)
+            for genres in ["Drama,Action", "Drama", "Comedy,Action", "Drama,Horror"]
+        ]
+        collection = CollectionFactory(user=user_create, movies=movies)
+
+        assert GenreHistogram.top_favourite_genres(
+            user_create, n=2
+        ) == TopFavouriteGenres().top_favourite_genres_from_user_movie_collection(
+            user_create.collections.all(), n=2
+        )
+        assert collection.movies.count() == 4
+
+    def test_rebuild_repairs_counts(self, user_create):
+        CollectionFactory(user=user_create, movies=[MovieFactory(genres="Drama")])
+        UserGenreCount.objects.update(count=42)
+
+        assert GenreHistogram.rebuild() == 1
+        assert histogram(user_create) == {"Drama": 1}
+
+    def test_counts_follow_bulk_collection_update(self, api_client, user_create):
+        movie = MovieFactory(genres="Drama")
+        collection = CollectionFactory(user=user_create, movies=[movie])
+
+        api_client.put(
+            reverse("collection-details", args=[collection.uuid]),
+            {"movies": [{"uuid": str(movie.uuid), "genres": "Comedy"}]},
+            format="json",
+        )
+
+        assert histogram(user_create) == {"Comedy": 1}
@@ -0,0 +1,108 @@
+from unittest import mock
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError
+from urllib3.util import Retry
+from utility.metrics import Metrics, metrics
+from utility.retry_mechanism import RetryStrategy
+
+
+@pytest.fixture
+def registry():
+    return Metrics(flush_every=100, flush_interval=60)
+
+
+class TestMetrics(object):
+    def test_histogram_buckets_are_cumulative(self, registry):
+        registry.observe("http_request_duration_seconds", 0.03, view="movies")
+        registry.observe("http_request_duration_seconds", 2, view="movies")
+
+        totals = registry.totals()
+        bucket = 'http_request_duration_seconds_bucket{le="%s",view="movies"}'
+        assert totals[bucket % "0.025"] == 0
+        assert totals[bucket % "0.05"] == 1
+        assert totals[bucket % "2.5"] == 2
+        assert totals[bucket % "+Inf"] == 2
+        assert totals['http_request_duration_seconds_count{view="movies"}'] == 2
+        assert totals['http_request_duration_seconds_sum{view="movies"}'] == 2.03
+
+    def test_buffered_until_flush(self, registry):
+        other_worker = Metrics(flush_every=100, flush_interval=60)
+        registry.inc("upstream_retries_total", 2, host="a")
+
+        assert other_worker.totals() == {}
+        registry.flush()
+        assert other_worker.totals() == {'upstream_retries_total{host="a"}': 2}
+
+    def test_render_prometheus_text(self, registry):
+        registry.observe("http_request_db_queries", 3, view="movies")
+        registry.inc("upstream_requests_total", host="a", outcome="success")
+
+        lines = registry.render().splitlines()
+
+        assert lines[:3] == [
+            "# HELP http_request_db_queries Number of database queries run by a "
+            "request, by view.",
+            "# TYPE http_request_db_queries histogram",
+            'http_request_db_queries_bucket{le="0",view="movies"} 0',
+        ]
+        assert lines.index(
+            'http_request_db_queries_bucket{le="100",view="movies"} 1'
+        ) < lines.index('http_request_db_queries_bucket{le="+Inf",view="movies"} 1')
+        assert "# TYPE upstream_requests_total counter" in lines
+        assert 'upstream_requests_total{host="a",outcome="success"} 1' in lines
+
+    def test_redis_totals_shared_by_workers(self, registry, redis_cache):
+        other_worker = Metrics(flush_every=100, flush_interval=60)
+        registry.observe("http_request_duration_seconds", 0.03, view="movies")
+        other_worker.observe("http_request_duration_seconds", 0.5, view="movies")
+        other_worker.flush()
+
+        totals = registry.totals()
+
+        bucket = 'http_request_duration_seconds_bucket{le="%s",view="movies"}'
+        assert totals[bucket % "0.05"] == 1
+        assert totals[bucket % "+Inf"] == 2
+        assert totals['http_request_duration_seconds_sum{view="movies"}'] == 0.53
+        assert 'http_request_duration_seconds_count{view="movies"} 2' in (
+            registry.render().splitlines()
+        )
+
+    def test_label_values_escaped(self):
+        assert Metrics.format_labels({"view": 'a"b'}) == '{view="a\\"b"}'
+
+
+@pytest.mark.django_db
+class TestInstrumentation(object):
+    def test_requests_recorded_by_view(self, api_client, client):
+        api_client.get("/collection/")
+
+        body = client.get("/metrics/").content.decode()
+
+        assert 'http_request_duration_seconds_count{view="collection"} 1' in body
+        assert 'http_request_db_queries_count{view="collection"} 1' in body
+
+    def test_upstream_retries_recorded(self, settings):
+        settings.MOVIE_API_BREAKER_ENABLED = False
+        response = mock.Mock(status_code=200)
+        response.raw.retries = Retry(total=3).increment(
+            method="GET", url="/", error=requests.exceptions.ConnectionError()
+        )
+        session = mock.Mock(**{"get.return_value": response})
+
+        with mock.patch.object(RetryStrategy, "get_session", return_value=session):
+            RetryStrategy.fetch("https://example.com/movies/")
+        error = requests.exceptions.ConnectionError(MaxRetryError(None, "/"))
+        session.get.side_effect = error
+        with mock.patch.object(RetryStrategy, "get_session", return_value=session):
+            with pytest.raises(requests.exceptions.ConnectionError):
+                RetryStrategy.fetch("https://example.com/movies/")
+
+        body = metrics.render()
+        assert (
+            'upstream_retries_total{host="example.com"} %d'
+            % (1 + settings.MOVIE_API_RETRY_TOTAL)
+            in body
+        )
+        assert 'upstream_requests_total{host="example.com",outcome="error"} 1' in body
+        assert 'upstream_request_duration_seconds_count{host="example.com"} 2' in body
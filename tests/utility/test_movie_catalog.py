@@ -0,0 +1,158 @@
+import threading
+import time
+import pytest
+from unittest import mock
+from django.core.cache import cache
+from utility.movie_catalog import MovieCatalog
+from utility.retry_mechanism import RetryStrategy
+
+URL = "https://example.com/movies/"
+
+
+def upstream_response(status_code=200, data=None, headers=None):
+    response = mock.Mock(status_code=status_code, headers=headers or {})
+    response.json.return_value = data
+    return response
+
+
+@pytest.fixture
+def catalog(settings):
+    settings.MOVIE_API_CACHE_TTL = 60
+    settings.MOVIE_API_CACHE_STALE_TTL = 600
+    return MovieCatalog(URL, username="user", password="secret")
+
+
+class TestMovieCatalog(object):
+    def test_key_ignores_params_unknown_upstream(self):
+        assert MovieCatalog.make_key({"page": 1, "x": "random"}) == (
+            MovieCatalog.make_key({"page": 1})
+        )
+        assert MovieCatalog.make_key({"page": 1}) != MovieCatalog.make_key({"page": 2})
+
+    def test_unknown_params_not_sent_upstream(self, catalog):
+        with mock.patch.object(
+            RetryStrategy, "fetch", return_value=upstream_response(data={"count": 1})
+        ) as fetch:
+            catalog.get({"page": 1, "x": "a"})
+            catalog.get({"page": 1, "x": "b"})
+
+        assert fetch.call_count == 1
+        assert fetch.call_args.kwargs["params"] == {"page": 1}
+
+    def test_disabled_cache_stores_nothing(self, catalog, settings):
+        settings.MOVIE_API_CACHE_TTL = 0
+        with mock.patch.object(
+            RetryStrategy, "fetch", return_value=upstream_response(data={"count": 1})
+        ):
+            catalog.get({"page": 1})
+
+        assert cache.get(MovieCatalog.make_key({"page": 1})) is None
+
+    def test_fresh_page_served_from_cache(self, catalog):
+        with mock.patch.object(
+            RetryStrategy, "fetch", return_value=upstream_response(data={"count": 1})
+        ) as fetch:
+            assert catalog.get({"page": 1}) == {"count": 1}
+            assert catalog.get({"page": 1}) == {"count": 1}
+
+        assert fetch.call_count == 1
+        assert fetch.call_args.kwargs["params"] == {"page": 1}
+
+    def test_upstream_validators_cached_with_page(self, catalog):
+        headers = {"ETag": '"v1"', "Last-Modified": "Sat, 03 Feb 2024 10:00:00 GMT"}
+        with mock.patch.object(
+            RetryStrategy,
+            "fetch",
+            return_value=upstream_response(data={"count": 1}, headers=headers),
+        ) as fetch:
+            catalog.get_page()
+            assert catalog.get_page() == ({"count": 1}, headers)
+
+        assert fetch.call_count == 1
+
+    def test_failures_are_not_cached(self, catalog):
+        with mock.patch.object(
+            RetryStrategy, "fetch", return_value=upstream_response(status_code=502)
+        ) as fetch:
+            assert catalog.get()["status_code"] == 502
+            assert catalog.get()["status_code"] == 502
+
+        assert fetch.call_count == 2
+
+    def test_stale_page_served_while_refreshing(self, catalog):
+        cache.set(
+            MovieCatalog.make_key(),
+            {"data": {"count": 1}, "fetched_at": time.time() - 120},
+        )
+        with mock.patch.object(
+            RetryStrategy, "fetch", return_value=upstream_response(data={"count": 2})
+        ):
+            with mock.patch.object(catalog, "schedule_refresh") as schedule_refresh:
+                assert catalog.get() == {"count": 1}
+            schedule_refresh.assert_called_once_with({})
+
+            thread = catalog.schedule_refresh()
+            thread.join()
+
+        assert catalog.get() == {"count": 2}
+
+    def test_single_background_refresh(self, catalog):
+        cache.add("%s:refreshing" % MovieCatalog.make_key(), 1)
+
+        assert catalog.schedule_refresh() is None
+
+
+class TestRequestCoalescing(object):
+    def test_concurrent_callers_share_one_fetch(self, catalog, settings):
+        settings.MOVIE_API_COALESCE_WAIT = 5
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_fetch(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return upstream_response(data={"count": 3})
+
+        results = []
+        with mock.patch.object(RetryStrategy, "fetch", side_effect=slow_fetch) as fetch:
+            leader = threading.Thread(target=lambda: results.append(catalog.load()))
+            leader.start()
+            started.wait(5)
+            followers = [
+                threading.Thread(target=lambda: results.append(catalog.load()))
+                for _ in range(5)
+            ]
+            for follower in followers:
+                follower.start()
+            release.set()
+            for thread in [leader] + followers:
+                thread.join()
+
+        assert fetch.call_count == 1
+        assert results == [({"count": 3}, {})] * 6
+
+    def test_lease_outlasts_slowest_fetch(self, settings):
+        settings.MOVIE_API_COALESCE_LEASE = 60
+        with mock.patch.object(RetryStrategy, "max_duration", return_value=93.25):
+            assert MovieCatalog.lease_timeout() == 94
+        with mock.patch.object(RetryStrategy, "max_duration", return_value=30):
+            assert MovieCatalog.lease_timeout() == 60
+
+    def test_bounded_wait_returns_failure(self, catalog, settings):
+        settings.MOVIE_API_COALESCE_WAIT = 0.1
+        cache.add("%s:inflight" % MovieCatalog.make_key(), 1)
+
+        with mock.patch.object(RetryStrategy, "fetch") as fetch:
+            assert catalog.load() == (RetryStrategy.failure_response(503), {})
+        fetch.assert_not_called()
+
+    def test_waiter_fetches_when_leader_vanishes(self, catalog, settings):
+        settings.MOVIE_API_COALESCE_WAIT = 1
+        lease_key = "%s:inflight" % MovieCatalog.make_key()
+        cache.add(lease_key, 1)
+        threading.Timer(0.05, cache.delete, args=[lease_key]).start()
+
+        with mock.patch.object(
+            RetryStrategy, "fetch", return_value=upstream_response(data={"count": 4})
+        ):
+            assert catalog.load() == ({"count": 4}, {})
@@ -0,0 +1,43 @@
+import pytest
+from utility.movie_helper import TopFavouriteGenres
+from ..factories import CollectionFactory, MovieFactory, UserFactory
+
+
+@pytest.fixture
+def collections(user_create):
+    drama_action = MovieFactory(genres="Drama,Action")
+    drama = MovieFactory(genres="Drama")
+    comedy = MovieFactory(genres="Comedy, Action")
+    CollectionFactory(user=user_create, movies=[drama_action, drama, comedy])
+    CollectionFactory(user=user_create, movies=[comedy])
+    return user_create.collections.all()
+
+
+@pytest.mark.django_db
+class TestTopFavouriteGenres(object):
+    def test_top_n_genres(self):
+        assert (
+            TopFavouriteGenres.top_n_genres(["a", "b", "b", "c", "c", "c"], 2) == "c,b"
+        )
+
+    def test_python_and_database_agree(self, collections):
+        helper = TopFavouriteGenres()
+
+        assert (
+            helper.top_favourite_genres_from_user_movie_collection(collections, n=3)
+            == helper.top_favourite_genres_from_database(collections, n=3)
+            == "Action,Comedy,Drama"
+        )
+
+    def test_database_counts_in_one_query(self, collections, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            TopFavouriteGenres().top_favourite_genres_from_database(collections)
+
+    def test_many_users(self, collections, user_create):
+        other = UserFactory()
+        CollectionFactory(user=other, movies=[MovieFactory(genres="Horror")])
+        idle = UserFactory()
+
+        assert TopFavouriteGenres().top_favourite_genres_for_users(
+            [user_create.id, other.id, idle.id], n=1
+        ) == {user_create.id: "Action", other.id: "Horror", idle.id: ""}
@@ -0,0 +1,71 @@
+from unittest import mock
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from utility.request_counter import RequestCounter
+
+
+class TestRequestCounter(object):
+    def test_buffered_until_flush_every(self):
+        counter = RequestCounter(flush_every=3, flush_interval=60)
+
+        counter.record("movies", 200)
+        counter.record("movies", 404)
+        assert cache.get(RequestCounter.total_key) is None
+
+        counter.record("collection", 201)
+        assert cache.get(RequestCounter.total_key) == 3
+
+    def test_flushed_after_interval(self):
+        counter = RequestCounter(flush_every=100, flush_interval=0.001)
+        counter.last_flush -= 1
+
+        counter.record("movies", 200)
+
+        assert cache.get(RequestCounter.total_key) == 1
+
+    def test_totals_by_route_and_status_class(self):
+        counter = RequestCounter(flush_every=100, flush_interval=60)
+        for status_code in (200, 201, 503):
+            counter.record("movies", status_code)
+        counter.record("collection", 200)
+
+        assert counter.totals() == {
+            "requests": 4,
+            "routes": {
+                "movies": {"2xx": 2, "5xx": 1},
+                "collection": {"2xx": 1},
+            },
+        }
+
+        counter.reset()
+        assert counter.totals() == {"requests": 0, "routes": {}}
+
+    def test_counts_kept_when_flush_fails(self):
+        counter = RequestCounter(flush_every=100, flush_interval=60)
+        counter.record("movies", 200)
+
+        with mock.patch.object(counter, "write_cache", side_effect=ConnectionError):
+            counter.flush()
+        counter.flush()
+
+        assert cache.get(RequestCounter.total_key) == 1
+
+    def test_redis_flush_uses_one_pipeline(self, redis_cache):
+        counter = RequestCounter(flush_every=100, flush_interval=60)
+        counter.record("movies", 200)
+        counter.record("movies", 200)
+        counter.record("collection", 404)
+        connection = get_redis_connection("default")
+
+        with mock.patch.object(
+            connection, "pipeline", wraps=connection.pipeline
+        ) as pipeline:
+            counter.flush()
+
+        pipeline.assert_called_once_with(transaction=False)
+        assert counter.totals() == {
+            "requests": 3,
+            "routes": {"movies": {"2xx": 2}, "collection": {"4xx": 1}},
+        }
+        counter.reset()
+        assert counter.totals() == {"requests": 0, "routes": {}}
@@ -0,0 +1,59 @@
+from unittest import mock
+import pytest
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from utility.request_rates import RequestRates
+
+NOW = 1_700_000_040  # a minute boundary
+
+
+@pytest.fixture
+def rates():
+    return RequestRates()
+
+
+class TestRequestRates(object):
+    def test_buffered_until_next_second(self, rates):
+        rates.record(1, now=NOW)
+        rates.record(2, now=NOW + 0.5)
+        assert cache.get(rates._key("requests", "s", NOW)) is None
+
+        rates.record(1, now=NOW + 1)
+        assert cache.get(rates._key("requests", "s", NOW)) == 2
+
+    def test_windows(self, rates):
+        for user_id in (1, 2, 2):
+            rates.record(user_id, now=NOW - 1)
+        rates.record(3, now=NOW - 30)
+        rates.record(None, now=NOW - 90)  # anonymous, older than a minute
+
+        windows = rates.windows(now=NOW)
+
+        assert windows["second"] == {"requests": 3, "per_second": 3.0, "users": 2}
+        assert windows["minute"] == {"requests": 4, "per_second": 0.067, "users": 3}
+        assert windows["hour"] == {"requests": 5, "per_second": 0.001, "users": 3}
+
+    def test_current_second_not_in_windows(self, rates):
+        rates.record(1, now=NOW)
+
+        assert rates.windows(now=NOW)["second"]["requests"] == 0
+
+    def test_redis_flush_uses_one_pipeline(self, rates, redis_cache):
+        for user_id in (7, 8, 7):
+            rates.record(user_id, now=NOW - 1)
+        connection = get_redis_connection("default")
+
+        with mock.patch.object(
+            connection, "pipeline", wraps=connection.pipeline
+        ) as pipeline:
+            rates.flush()
+
+        pipeline.assert_called_once_with(transaction=False)
+        key = cache.make_key(rates._key("requests", "m", (NOW - 1) // 60))
+        assert 0 < connection.ttl(key) <= RequestRates.MINUTE_BUCKET_TTL
+        # read back with MGET and PFCOUNT.
+        assert rates.windows(now=NOW)["second"] == {
+            "requests": 3,
+            "per_second": 3.0,
+            "users": 2,
+        }
@@ -0,0 +1,58 @@
+import pytest
+import requests
+from unittest import mock
+from utility.retry_mechanism import RetryStrategy
+
+
+@pytest.fixture
+def fresh_session():
+    RetryStrategy.close_session()
+    yield
+    RetryStrategy.close_session()
+
+
+class TestRetryStrategy(object):
+    def test_session_is_shared(self, fresh_session):
+        assert RetryStrategy.get_session() is RetryStrategy.get_session()
+
+    def test_adapter_mounted_for_both_schemes(self, fresh_session):
+        session = RetryStrategy.get_session()
+        http_adapter = session.get_adapter("http://example.com")
+        https_adapter = session.get_adapter("https://example.com")
+
+        assert http_adapter is https_adapter
+        assert http_adapter.max_retries.total == 4
+        # a full pool must never make a thread wait without a timeout.
+        assert http_adapter._pool_block is False
+
+    def test_timeout_passed_per_request(self, fresh_session, settings):
+        settings.MOVIE_API_CONNECT_TIMEOUT = 1
+        settings.MOVIE_API_READ_TIMEOUT = 2
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {"count": 0}
+
+        with mock.patch.object(
+            RetryStrategy.get_session(), "get", return_value=response
+        ) as session_get:
+            data = RetryStrategy.retry_mechanism("https://example.com/movies/")
+
+        assert data == {"count": 0}
+        assert session_get.call_args.kwargs["timeout"] == (1, 2)
+
+    def test_request_error_returns_failure(self, fresh_session):
+        with mock.patch.object(
+            RetryStrategy.get_session(),
+            "get",
+            side_effect=requests.exceptions.ConnectTimeout,
+        ):
+            data = RetryStrategy.retry_mechanism("https://example.com/movies/")
+
+        assert data["status_code"] == 503
+
+    def test_max_duration_covers_retries_and_backoff(self, settings):
+        settings.MOVIE_API_RETRY_TOTAL = 4
+        settings.MOVIE_API_RETRY_BACKOFF = 2
+        settings.MOVIE_API_CONNECT_TIMEOUT = 3
+        settings.MOVIE_API_READ_TIMEOUT = 10
+        # 5 attempts of 13s, then sleeps of 4, 8 and 16s.
+        assert RetryStrategy.max_duration() == 5 * 13 + 28
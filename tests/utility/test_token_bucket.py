@@ -0,0 +1,61 @@
+from unittest import mock
+import pytest
+from django.core.cache import cache
+from utility import token_bucket as token_bucket_module
+from utility.token_bucket import TokenBucket
+
+
+@pytest.fixture(params=["cache", "redis"])
+def backend(request):
+    # the Lua script (on fakeredis) and the cache api fallback must behave the same.
+    if request.param == "redis":
+        request.getfixturevalue("redis_cache")
+    return request.param
+
+
+class TestTokenBucket(object):
+    def test_burst_then_refused_until_refilled(self, backend):
+        bucket = TokenBucket("test", rate=10, capacity=2)
+        with mock.patch("time.time", return_value=1000):
+            assert bucket.consume() == (True, 0)
+            assert bucket.consume() == (True, 0)
+            allowed, wait = bucket.consume()
+        assert not allowed
+        assert wait == pytest.approx(0.1)
+
+        with mock.patch("time.time", return_value=1000.1):
+            assert bucket.consume()[0]
+            assert bucket.consume() == (False, pytest.approx(0.1))
+
+    def test_refill_capped_at_capacity(self, backend):
+        bucket = TokenBucket("test", rate=10, capacity=2)
+        with mock.patch("time.time", return_value=1000):
+            bucket.consume()
+        with mock.patch("time.time", return_value=2000):
+            assert [bucket.consume()[0] for _ in range(3)] == [True, True, False]
+
+    def test_script_runs_on_redis(self, redis_cache):
+        bucket = TokenBucket("test", rate=1, capacity=3)
+        with mock.patch("time.time", return_value=1000):
+            results = [bucket.consume() for _ in range(4)]
+
+        assert results == [(True, 0)] * 3 + [(False, 1)]
+        assert TokenBucket._script is not None
+
+    def test_redis_uses_lua_script(self):
+        connection = mock.Mock()
+        script = connection.register_script.return_value
+        script.return_value = [0, "1.5"]
+
+        with mock.patch.object(TokenBucket, "_script", None):
+            with mock.patch.object(
+                token_bucket_module, "get_redis_connection", return_value=connection
+            ):
+                result = TokenBucket("test", rate=2, capacity=5).consume()
+
+        assert result == (False, 1.5)
+        script.assert_called_once_with(
+            keys=[cache.make_key("token_bucket:test")],
+            args=[2, 5, 1],
+            client=connection,
+        )
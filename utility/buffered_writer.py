@@ -0,0 +1,122 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedWriter(object):
+    """
+    Per-process buffer of increments, written to the default (redis) cache in batches.
+
+    Recording only updates the buffer under a lock, so it never waits on redis. The buffer
+    is flushed once `is_due` says so, by default every `flush_every` records or on the
+    first record after `flush_interval` seconds (defaults read from the settings named by
+    `flush_every_setting` and `flush_interval_setting`). A flush queues the whole buffer on
+    one redis pipeline (`write_redis`); with a cache backend other than django_redis the
+    plain cache api is used instead (`write_cache`), which is not atomic across processes.
+    A failed flush merges the buffer back for the next one.
+
+    Subclasses implement `write_redis` and `write_cache`, and `new_buffer` and `merge` when
+    the buffer is not a Counter.
+
+    Example:
+    --------
+    ```python
+    class Hits(BufferedWriter):
+        def write_redis(self, pipeline, buffer):
+            for key, count in buffer.items():
+                pipeline.incrby(cache.make_key(key), count)
+
+        def write_cache(self, buffer):
+            ...
+
+    hits = flush_at_exit(Hits(flush_every=100, flush_interval=5))
+    hits.add({"movies": 1})
+    ```
+    """
+
+    name = "Buffer"
+    flush_every_setting = None
+    flush_interval_setting = None
+
+    def __init__(self, flush_every=None, flush_interval=None):
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.buffer = self.new_buffer()
+        self.pending = 0
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def new_buffer():
+        return Counter()
+
+    @staticmethod
+    def merge(buffer, items):
+        buffer.update(items)
+
+    def is_due(self, items):
+        """Called with the lock held, after `items` were added to the buffer."""
+        flush_every = self.flush_every or getattr(settings, self.flush_every_setting)
+        flush_interval = self.flush_interval or getattr(
+            settings, self.flush_interval_setting
+        )
+        return (
+            self.pending >= flush_every
+            or time.monotonic() - self.last_flush >= flush_interval
+        )
+
+    def add(self, items):
+        with self.lock:
+            self.merge(self.buffer, items)
+            self.pending += 1
+            due = self.is_due(items)
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            buffer, self.buffer = self.buffer, self.new_buffer()
+            self.pending = 0
+            self.last_flush = time.monotonic()
+        if not buffer:
+            return
+
+        try:
+            try:
+                pipeline = get_redis_connection("default").pipeline(transaction=False)
+            except NotImplementedError:
+                self.write_cache(buffer)
+            else:
+                self.write_redis(pipeline, buffer)
+                pipeline.execute()
+        except Exception:
+            logger.warning("%s could not be flushed", self.name, exc_info=True)
+            with self.lock:
+                self.merge(self.buffer, buffer)
+
+    def write_redis(self, pipeline, buffer):
+        raise NotImplementedError
+
+    def write_cache(self, buffer):
+        raise NotImplementedError
+
+    def clear(self):
+        """Drops the buffer of this process."""
+        with self.lock:
+            self.buffer = self.new_buffer()
+            self.pending = 0
+
+
+def flush_at_exit(writer):
+    """
+    Flushes the buffer of `writer` when the process exits, so a worker that is stopped
+    doesn't lose what it recorded since its last flush. Returns the writer.
+    """
+    atexit.register(writer.flush)
+    return writer
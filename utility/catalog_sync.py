@@ -0,0 +1,138 @@
+import uuid
+from django.conf import settings
+from movies.models import Genre, Movies, CatalogSyncCheckpoint
+from utility.collection_version import CollectionVersion
+from utility.genre_histogram import GenreHistogram
+from utility.response_cache import ResponseCache
+from utility.retry_mechanism import RetryStrategy
+
+
+class CatalogSync(object):
+    """
+    Mirrors the paginated third-party movie catalog into the Movies table.
+
+    Pages are requested one at a time by following the `next` links of the api, and the
+    movies of each page are upserted (keyed by uuid) in batches of `batch_size`, so
+    memory use is bounded by one page whatever the size of the catalog. After every page
+    the checkpoint is updated, an interrupted run therefore resumes where it stopped and
+    a rerun after a completed sync starts again from the last page.
+
+    Example:
+    --------
+    ```python
+    CatalogSync(url, username=username, password=password, verify=False).run()
+    ```
+
+    Methods:
+    --------
+    run(full=False):
+        Syncs the catalog, from the first page if `full` is set, from the checkpoint otherwise.
+    """
+
+    checkpoint_name = "movie_api"
+    update_fields = ["title", "description", "genres"]
+
+    def __init__(self, url, username=None, password=None, verify=None, batch_size=None):
+        self.url = url
+        self.username = username
+        self.password = password
+        self.verify = verify
+        self.batch_size = batch_size or settings.MOVIE_SYNC_BATCH_SIZE
+
+    def get_checkpoint(self):
+        checkpoint, _ = CatalogSyncCheckpoint.objects.get_or_create(
+            name=self.checkpoint_name
+        )
+        return checkpoint
+
+    def fetch_page(self, url):
+        response = RetryStrategy.fetch(
+            url, username=self.username, password=self.password, verify=self.verify
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def upsert(self, movies):
+        # the api may repeat a movie across a page boundary, keep the last copy only.
+        objs = {
+            uuid.UUID(str(movie["uuid"])): Movies(
+                uuid=movie["uuid"],
+                title=movie.get("title") or "",
+                description=movie.get("description") or "",
+                genres=movie.get("genres") or "",
+            )
+            for movie in movies
+        }
+        # bulk upserts send no post_save, collect the movies that are in collections so
+        # genre counts and cached collection responses can follow changes.
+        collected = (
+            Movies.objects.filter(uuid__in=objs.keys(), collections__isnull=False)
+            .values_list("uuid", "id", *self.update_fields)
+            .distinct()
+        )
+        genre_changes = {}
+        changed = []
+        for movie_uuid, movie_id, title, description, genres in collected:
+            movie = objs[movie_uuid]
+            if (movie.title, movie.description, movie.genres) != (
+                title,
+                description,
+                genres,
+            ):
+                changed.append(movie_id)
+            if movie.genres != genres:
+                genre_changes[movie_id] = genres
+
+        Movies.objects.bulk_create(
+            objs.values(),
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=["uuid"],
+            update_fields=self.update_fields,
+        )
+        Genre.objects.sync_movies(
+            Movies.objects.filter(uuid__in=objs.keys()).values_list("id", flat=True)
+        )
+        GenreHistogram.genres_changed(genre_changes)
+        CollectionVersion.bump_for_movies(changed)
+        ResponseCache.invalidate_movies(changed)
+        return len(objs)
+
+    def run(self, full=False):
+        """
+        Returns:
+        --------
+        CatalogSyncCheckpoint: The checkpoint after the run.
+
+        Raises:
+        -------
+        requests.exceptions.RequestException, CircuitOpenError: If a page can't be fetched.
+        The checkpoint keeps the progress made so far.
+        """
+        checkpoint = self.get_checkpoint()
+        if full or not checkpoint.next_url:
+            checkpoint.next_url = self.url
+            checkpoint.pages_synced = 0
+            checkpoint.movies_synced = 0
+        checkpoint.completed = False
+        checkpoint.save()
+
+        url = checkpoint.next_url
+        while url:
+            page = self.fetch_page(url)
+            movies = page.get("data") or []
+            for start in range(0, len(movies), self.batch_size):
+                checkpoint.movies_synced += self.upsert(
+                    movies[start : start + self.batch_size]
+                )
+            checkpoint.pages_synced += 1
+
+            if page.get("next"):
+                checkpoint.next_url = page["next"]
+            else:
+                # keep pointing at the last page, new movies get appended to it.
+                checkpoint.next_url = url
+                checkpoint.completed = True
+            checkpoint.save()
+            url = page.get("next")
+        return checkpoint
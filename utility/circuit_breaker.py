@@ -0,0 +1,174 @@
+import logging
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+# Sent on every state transition with `name`, `old_state` and `new_state`.
+circuit_state_changed = Signal()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+    def __init__(self, name, retry_after):
+        super().__init__("Circuit '%s' is open" % name)
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker(object):
+    """
+    Circuit breaker whose state is kept in the default (redis) cache, so it is shared by
+    every worker process.
+
+    - closed: requests flow, consecutive failures are counted. Reaching
+      MOVIE_API_BREAKER_FAILURE_THRESHOLD failures within MOVIE_API_BREAKER_FAILURE_WINDOW
+      seconds opens the circuit.
+    - open: requests are refused straight away for MOVIE_API_BREAKER_COOLDOWN seconds.
+    - half_open: after the cool-down a single caller (across all workers) is let through
+      as a probe. Success closes the circuit, failure opens it for another cool-down.
+
+    Every transition is logged and sent as the `circuit_state_changed` signal.
+
+    Example:
+    --------
+    ```python
+    breaker = CircuitBreaker("movie-api")
+    if breaker.allow_request():
+        ...
+        breaker.record_success()  # or breaker.record_failure()
+    ```
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    key_prefix = "circuit"
+
+    def __init__(
+        self, name, failure_threshold=None, cooldown=None, failure_window=None
+    ):
+        self.name = name
+        self.failure_threshold = (
+            failure_threshold or settings.MOVIE_API_BREAKER_FAILURE_THRESHOLD
+        )
+        self.cooldown = cooldown or settings.MOVIE_API_BREAKER_COOLDOWN
+        self.failure_window = (
+            failure_window or settings.MOVIE_API_BREAKER_FAILURE_WINDOW
+        )
+
+    def _key(self, suffix):
+        return "%s:%s:%s" % (self.key_prefix, self.name, suffix)
+
+    @staticmethod
+    def _incr(key, timeout):
+        # the key can expire, or be cleared by a success, between the add and the incr.
+        while True:
+            if cache.add(key, 1, timeout=timeout):
+                return 1
+            try:
+                return cache.incr(key)
+            except ValueError:
+                continue
+
+    def _get_state(self):
+        return cache.get(self._key("state")) or {
+            "state": self.CLOSED,
+            "opened_at": None,
+        }
+
+    def _transition(self, old_state, new_state):
+        cache.set(
+            self._key("state"),
+            {
+                "state": new_state,
+                "opened_at": time.time() if new_state == self.OPEN else None,
+            },
+            timeout=None,
+        )
+        if new_state == self.CLOSED:
+            cache.delete_many([self._key("failures"), self._key("probe")])
+        elif new_state == self.OPEN:
+            cache.delete(self._key("probe"))
+
+        self._incr(self._key("transitions:%s" % new_state), timeout=None)
+
+        logger.warning(
+            "Circuit '%s' changed from %s to %s", self.name, old_state, new_state
+        )
+        circuit_state_changed.send(
+            sender=self.__class__,
+            name=self.name,
+            old_state=old_state,
+            new_state=new_state,
+        )
+
+    @property
+    def state(self):
+        return self._get_state()["state"]
+
+    def retry_after(self):
+        opened_at = self._get_state()["opened_at"]
+        if opened_at is None:
+            return 0
+        return max(0, int(opened_at + self.cooldown - time.time()))
+
+    def allow_request(self):
+        current = self._get_state()
+        if current["state"] == self.CLOSED:
+            return True
+
+        if current["state"] == self.OPEN:
+            if time.time() - current["opened_at"] < self.cooldown:
+                return False
+            if cache.add(self._key("probe"), 1, timeout=self.cooldown):
+                self._transition(self.OPEN, self.HALF_OPEN)
+                return True
+            return False
+
+        # half open: only the caller holding the probe lease gets through. The lease
+        # expires after one cool-down in case the probing process died.
+        return cache.add(self._key("probe"), 1, timeout=self.cooldown)
+
+    def record_success(self):
+        state = self.state
+        if state != self.CLOSED:
+            self._transition(state, self.CLOSED)
+        else:
+            cache.delete(self._key("failures"))
+
+    def record_failure(self):
+        state = self.state
+        if state == self.HALF_OPEN:
+            self._transition(state, self.OPEN)
+            return
+        if state == self.OPEN:
+            return
+
+        failures = self._incr(self._key("failures"), timeout=self.failure_window)
+        if failures >= self.failure_threshold:
+            self._transition(state, self.OPEN)
+
+    def status(self):
+        current = self._get_state()
+        transitions = cache.get_many(
+            [
+                self._key("transitions:%s" % state)
+                for state in (self.CLOSED, self.OPEN, self.HALF_OPEN)
+            ]
+        )
+        return {
+            "name": self.name,
+            "state": current["state"],
+            "opened_at": current["opened_at"],
+            "retry_after": self.retry_after(),
+            "failures": cache.get(self._key("failures")) or 0,
+            "transitions": {
+                state: transitions.get(self._key("transitions:%s" % state), 0)
+                for state in (self.CLOSED, self.OPEN, self.HALF_OPEN)
+            },
+        }
@@ -0,0 +1,55 @@
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from movies.models import Collection, Movies
+
+
+class CollectionExport(object):
+    """
+    Streams the collections of a user, with their movies, as NDJSON.
+
+    Collections are read with `iterator(chunk_size=COLLECTION_EXPORT_CHUNK_SIZE)`, the
+    movies being prefetched one chunk of collections at a time, so memory use stays
+    constant whatever the size of the account. Each line has the shape of the body of
+    `POST /collection/` (plus the collection uuid), so an export can be imported again.
+
+    Example:
+    --------
+    ```python
+    StreamingHttpResponse(CollectionExport(request.user).lines(), content_type=...)
+    ```
+    """
+
+    content_type = "application/x-ndjson"
+    movie_fields = ["uuid", "title", "description", "genres"]
+
+    def __init__(self, user, chunk_size=None):
+        self.user = user
+        self.chunk_size = chunk_size or settings.COLLECTION_EXPORT_CHUNK_SIZE
+
+    def get_queryset(self):
+        return (
+            Collection.objects.filter(user=self.user)
+            .order_by("id")
+            .only("uuid", "title", "description")
+            .prefetch_related(
+                Prefetch(
+                    "movies",
+                    queryset=Movies.objects.order_by("id").only(*self.movie_fields),
+                )
+            )
+        )
+
+    def lines(self):
+        for collection in self.get_queryset().iterator(chunk_size=self.chunk_size):
+            record = {
+                "uuid": collection.uuid,
+                "title": collection.title,
+                "description": collection.description,
+                "movies": [
+                    {field: getattr(movie, field) for field in self.movie_fields}
+                    for movie in collection.movies.all()
+                ],
+            }
+            yield json.dumps(record, cls=DjangoJSONEncoder) + "\n"
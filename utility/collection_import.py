@@ -0,0 +1,204 @@
+import codecs
+import json
+from django.conf import settings
+from django.db import transaction
+from movies.models import Collection, Genre, Movies
+from movies.serializers import ImportCollectionSerializer
+from utility.genre_histogram import GenreHistogram
+from utility.response_cache import ResponseCache
+
+
+class CollectionImportError(ValueError):
+    """
+    Raised when the import body is not valid JSON. `summary` holds what was imported from
+    the body before the error.
+    """
+
+    summary = None
+
+
+class CollectionImport(object):
+    """
+    Imports many collections of a user from a streamed body.
+
+    The body is either NDJSON (one collection per line) or a JSON array of collections,
+    each collection shaped like the body of `POST /collection/`. It is decoded while it is
+    read, and collections are imported COLLECTION_IMPORT_CHUNK_SIZE at a time, each chunk
+    in its own transaction with a fixed number of bulk queries: new movies are inserted
+    (known movies are kept as they are, like on collection create), then the collections,
+    then their memberships. Memory use is bounded by one chunk whatever the size of the body.
+
+    Invalid collections (and values that are not objects) are skipped and reported by their
+    position in the body. Malformed JSON stops the import: the collections before it are
+    imported and the error carries their summary, so the client can resume after them.
+
+    Example:
+    --------
+    ```python
+    summary = CollectionImport(request.user).run(request.stream)
+    # {"collections": 120, "movies": 2400, "errors": {"7": {"title": [...]}}}
+    ```
+    """
+
+    read_size = 65536
+
+    def __init__(self, user, chunk_size=None):
+        self.user = user
+        self.chunk_size = chunk_size or settings.COLLECTION_IMPORT_CHUNK_SIZE
+
+    @classmethod
+    def parse(cls, stream):
+        """
+        Yields the values of an NDJSON or JSON array body, reading it `read_size` bytes
+        at a time.
+
+        Raises:
+        -------
+        CollectionImportError: If the body is not valid JSON, with the line and byte
+        offset of the error in the body.
+        """
+        decoder = json.JSONDecoder()
+        text = codecs.getincrementaldecoder("utf-8")()
+        buffer = ""
+        position = 0
+        # bytes and lines of the body before the buffer.
+        offset = 0
+        line = 1
+        eof = False
+        while True:
+            # separators between values: whitespace, newlines, commas and the array brackets.
+            while position < len(buffer) and buffer[position] in " \t\r\n,[]":
+                position += 1
+            if position < len(buffer):
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if eof:
+                        consumed = buffer[:position]
+                        raise CollectionImportError(
+                            "Invalid JSON at line %d (byte offset %d)."
+                            % (
+                                line + consumed.count("\n"),
+                                offset + len(consumed.encode("utf-8")),
+                            )
+                        )
+                else:
+                    position = end
+                    yield value
+                    continue
+            elif eof:
+                return
+
+            chunk = stream.read(cls.read_size) if stream is not None else b""
+            consumed = buffer[:position]
+            offset += len(consumed.encode("utf-8"))
+            line += consumed.count("\n")
+            buffer = buffer[position:] + text.decode(chunk, final=not chunk)
+            position = 0
+            eof = not chunk
+
+    def run(self, stream):
+        summary = {"collections": 0, "movies": 0, "errors": {}}
+        chunk = []
+        try:
+            for index, item in enumerate(self.parse(stream)):
+                chunk.append((index, item))
+                if len(chunk) == self.chunk_size:
+                    self.import_items(chunk, summary)
+                    chunk = []
+        except CollectionImportError as exc:
+            # everything before the error is imported, like earlier chunks already are.
+            self.import_items(chunk, summary)
+            exc.summary = summary
+            raise
+        self.import_items(chunk, summary)
+        return summary
+
+    def import_items(self, items, summary):
+        valid = []
+        for index, item in items:
+            if not isinstance(item, dict):
+                summary["errors"][str(index)] = {
+                    "non_field_errors": ["Expected a collection object."]
+                }
+                continue
+            serializer = ImportCollectionSerializer(data=item)
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+            else:
+                summary["errors"][str(index)] = serializer.errors
+        if valid:
+            collections, movies = self.import_chunk(valid)
+            summary["collections"] += collections
+            summary["movies"] += movies
+
+    def import_chunk(self, collections):
+        """
+        Returns:
+        --------
+        tuple: (collections, movies) the number of collections created and of movies
+        added to them.
+        """
+        movies = {
+            movie["uuid"]: movie
+            for collection in collections
+            for movie in collection["movies"]
+        }
+        with transaction.atomic():
+            Movies.objects.bulk_create(
+                [
+                    Movies(
+                        uuid=movie["uuid"],
+                        title=movie["title"],
+                        description=movie["description"],
+                        genres=movie["genres"],
+                    )
+                    for movie in movies.values()
+                ],
+                ignore_conflicts=True,
+            )
+            movie_ids = dict(
+                Movies.objects.filter(uuid__in=movies.keys()).values_list("uuid", "id")
+            )
+
+            created = Collection.objects.bulk_create(
+                [
+                    Collection(
+                        title=collection["title"],
+                        description=collection["description"],
+                        user=self.user,
+                    )
+                    for collection in collections
+                ]
+            )
+            # the uuids are generated here, read back the primary keys through them.
+            collection_ids = dict(
+                Collection.objects.filter(
+                    uuid__in=[collection.uuid for collection in created]
+                ).values_list("uuid", "id")
+            )
+            pairs = {
+                (collection_ids[instance.uuid], movie_ids[movie["uuid"]])
+                for instance, collection in zip(created, collections)
+                for movie in collection["movies"]
+            }
+            Collection.movies.through.objects.bulk_create(
+                [
+                    Collection.movies.through(
+                        collection_id=collection_id, movies_id=movie_id
+                    )
+                    for collection_id, movie_id in pairs
+                ],
+                ignore_conflicts=True,
+            )
+
+            # bulk inserts send no signals, keep the genre tags, the genre histogram and
+            # the cached collection list in step.
+            Genre.objects.sync_movies(
+                Movies.objects.filter(
+                    id__in=movie_ids.values(), movie_genres__isnull=True
+                ).values_list("id", flat=True)
+            )
+            GenreHistogram.movies_added(pairs)
+            ResponseCache.invalidate([ResponseCache.user_scope(self.user.id)])
+        return len(created), len(pairs)
@@ -0,0 +1,114 @@
+import hashlib
+import uuid
+from django.db.models import Count, F, Max, Sum
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from movies.models import Collection
+
+
+class CollectionVersion(object):
+    """
+    Cheap validators (ETag and Last-Modified) for the collection endpoints.
+
+    A collection changes version whenever its row is saved (`updated_at`) or its movies
+    change (`revision`, bumped by movies.signals). The version of a user's collection list
+    is derived from one aggregate query over their collections, so neither needs any
+    movie row or serializer to be evaluated. The list only has an ETag: the latest
+    `updated_at` of the remaining collections goes back in time when the most recent one
+    is deleted, so it can't serve as a Last-Modified.
+
+    Example:
+    --------
+    ```python
+    validators = CollectionVersion.for_user(request)
+    not_modified = CollectionVersion.conditional_response(request, validators)
+    if not_modified is not None:
+        return not_modified
+    ```
+    """
+
+    @staticmethod
+    def bump(collections):
+        """Bumps the revision of a queryset of collections, in one update."""
+        collections.update(revision=F("revision") + 1, updated_at=timezone.now())
+
+    @classmethod
+    def bump_for_movies(cls, movie_ids):
+        movie_ids = list(movie_ids)
+        if movie_ids:
+            cls.bump(
+                Collection.objects.filter(
+                    id__in=Collection.movies.through.objects.filter(
+                        movies_id__in=movie_ids
+                    ).values("collection_id")
+                )
+            )
+
+    @staticmethod
+    def _validators(request, *parts):
+        # the query string (cursor, page size, filters) selects a different representation.
+        parts = parts + (request.get_full_path(),)
+        digest = hashlib.sha1(":".join(map(str, parts)).encode()).hexdigest()
+        return {"etag": quote_etag(digest)}
+
+    @classmethod
+    def for_user(cls, request):
+        version = Collection.objects.filter(user_id=request.user.id).aggregate(
+            count=Count("id"),
+            last_id=Max("id"),
+            revisions=Sum("revision"),
+            updated_at=Max("updated_at"),
+        )
+        return cls._validators(
+            request,
+            request.user.id,
+            version["count"],
+            version["last_id"],
+            version["revisions"],
+            version["updated_at"],
+        )
+
+    @classmethod
+    def for_collection(cls, request, collection_uuid):
+        """Returns None for an unknown or malformed uuid, the view then answers 404."""
+        try:
+            collection_uuid = uuid.UUID(str(collection_uuid))
+        except ValueError:
+            return None
+        version = (
+            Collection.objects.filter(uuid=collection_uuid)
+            .values_list("id", "revision", "updated_at")
+            .first()
+        )
+        if version is None:
+            return None
+        validators = cls._validators(request, request.user.id, *version)
+        validators["last_modified"] = version[2]
+        return validators
+
+    @staticmethod
+    def conditional_response(request, validators):
+        """
+        Returns a 304 response if the request's If-None-Match/If-Modified-Since match,
+        None otherwise.
+        """
+        if validators is None:
+            return None
+        last_modified = validators.get("last_modified")
+        return get_conditional_response(
+            request,
+            etag=validators["etag"],
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+
+    @staticmethod
+    def set_headers(response, validators):
+        if validators is None:
+            return response
+        response["ETag"] = validators["etag"]
+        if validators.get("last_modified"):
+            response["Last-Modified"] = http_date(
+                validators["last_modified"].timestamp()
+            )
+        return response
@@ -0,0 +1,125 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# set for the rest of the request (or command) once it wrote, or after a recent write of
+# its user, reads then go to the primary.
+_pinned = ContextVar("db_pinned", default=False)
+_wrote = ContextVar("db_wrote", default=False)
+
+
+class PrimaryReplicaRouter(object):
+    """
+    Sends reads of the movies app to the `replica` database and everything else to the
+    primary (`default`), with read-your-writes:
+
+    - once a request wrote, its later reads go to the primary;
+    - reads inside a transaction on the primary stay on the primary;
+    - after a request of a user wrote, the user's requests read from the primary for
+      DATABASE_REPLICA_PIN_SECONDS (see ReadYourWrites), to cover the replication lag;
+    - reads in a `ReadYourWrites.primary()` block go to the primary.
+
+    Users and other auth models are always read from the primary, a token issued at
+    registration must work on the next request. Without a `replica` database (no
+    DATABASE_REPLICA_NAME) every query goes to the primary.
+    """
+
+    replica = "replica"
+    replica_app_labels = {"movies"}
+
+    def db_for_read(self, model, **hints):
+        if (
+            self.replica not in settings.DATABASES
+            or model._meta.app_label not in self.replica_app_labels
+            or _pinned.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return self.replica
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        _pinned.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica is a copy of the primary, objects from both can be related.
+        databases = {DEFAULT_DB_ALIAS, self.replica}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReadYourWrites(object):
+    """
+    Per request routing state of PrimaryReplicaRouter, driven by ReadYourWritesMiddleware
+    and the api authentication.
+
+    Example:
+    --------
+    ```python
+    ReadYourWrites.start()
+    ReadYourWrites.pin_user(user_id)  # reads from the primary after a recent write
+    ...
+    ReadYourWrites.finish(user_id)  # pins the user if the request wrote
+
+    with ReadYourWrites.primary():
+        ...  # reads whatever the pinning state
+    ```
+    """
+
+    key_prefix = "db_pin"
+
+    @classmethod
+    def make_key(cls, user_id):
+        return "%s:%s" % (cls.key_prefix, user_id)
+
+    @staticmethod
+    def start():
+        # worker threads are reused across requests, start from a clean state.
+        _pinned.set(False)
+        _wrote.set(False)
+
+    @classmethod
+    def pin_user(cls, user_id):
+        if PrimaryReplicaRouter.replica in settings.DATABASES and cache.get(
+            cls.make_key(user_id)
+        ):
+            _pinned.set(True)
+
+    @classmethod
+    def finish(cls, user_id):
+        if (
+            _wrote.get()
+            and user_id is not None
+            and PrimaryReplicaRouter.replica in settings.DATABASES
+        ):
+            cache.set(
+                cls.make_key(user_id),
+                1,
+                timeout=settings.DATABASE_REPLICA_PIN_SECONDS,
+            )
+
+    @staticmethod
+    def is_pinned():
+        return _pinned.get()
+
+    @staticmethod
+    @contextmanager
+    def primary():
+        """
+        Sends the reads of the block (or of the decorated function) to the primary.
+
+        For reads whose result outlives the request, e.g. a response stored in the
+        ResponseCache: read from a lagging replica after its scope was invalidated, it
+        would be kept under the new version.
+        """
+        token = _pinned.set(True)
+        try:
+            yield
+        finally:
+            # a write in the block pins the rest of the request.
+            if not _wrote.get():
+                _pinned.reset(token)
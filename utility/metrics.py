@@ -0,0 +1,193 @@
+import re
+import time
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from utility.buffered_writer import BufferedWriter, flush_at_exit
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Metrics(BufferedWriter):
+    """
+    Prometheus style counters and histograms, aggregated in each process and across all
+    workers in the default (redis) cache.
+
+    Observations are added to an in-process buffer of samples (a histogram observation
+    increments its cumulative buckets, `_sum` and `_count`). The buffer is flushed every
+    METRICS_FLUSH_EVERY observations, or on the first one after METRICS_FLUSH_INTERVAL
+    seconds, with one redis pipeline of HINCRBYFLOAT on the `metrics` hash, so recording
+    never waits on redis. With a cache backend other than django_redis the samples are
+    kept with the plain cache api instead, see BufferedWriter.
+
+    `render()` returns the totals of all workers in the Prometheus text format.
+
+    Example:
+    --------
+    ```python
+    metrics.observe("http_request_duration_seconds", 0.042, view="movies")
+    metrics.inc("upstream_retries_total", 2, host="movies.example.com")
+    metrics.render()
+    ```
+    """
+
+    name = "Metrics"
+    flush_every_setting = "METRICS_FLUSH_EVERY"
+    flush_interval_setting = "METRICS_FLUSH_INTERVAL"
+    hash_key = "metrics"
+    # name: (type, help, buckets)
+    definitions = {
+        "http_request_duration_seconds": (
+            "histogram",
+            "Time spent handling a request, by view.",
+            LATENCY_BUCKETS,
+        ),
+        "http_request_db_queries": (
+            "histogram",
+            "Number of database queries run by a request, by view.",
+            QUERY_COUNT_BUCKETS,
+        ),
+        "http_request_db_duration_seconds": (
+            "histogram",
+            "Time spent in database queries by a request, by view.",
+            LATENCY_BUCKETS,
+        ),
+        "upstream_request_duration_seconds": (
+            "histogram",
+            "Time spent calling an upstream api, retries included, by host.",
+            LATENCY_BUCKETS,
+        ),
+        "upstream_requests_total": (
+            "counter",
+            "Upstream api calls, by host and outcome.",
+            None,
+        ),
+        "upstream_retries_total": (
+            "counter",
+            "Retries made by the upstream session, by host.",
+            None,
+        ),
+    }
+
+    @staticmethod
+    def format_labels(labels):
+        if not labels:
+            return ""
+        return "{%s}" % ",".join(
+            '%s="%s"'
+            % (
+                name,
+                str(value)
+                .replace("\\", "\\\\")
+                .replace('"', '\\"')
+                .replace("\n", "\\n"),
+            )
+            for name, value in sorted(labels.items())
+        )
+
+    def inc(self, name, value=1, **labels):
+        self.add({name + self.format_labels(labels): value})
+
+    def observe(self, name, value, **labels):
+        buckets = self.definitions[name][2]
+        # every bucket is written, histogram_quantile needs them all.
+        samples = {
+            "%s_bucket%s"
+            % (name, self.format_labels(dict(labels, le=le))): int(value <= le)
+            for le in buckets
+        }
+        samples["%s_bucket%s" % (name, self.format_labels(dict(labels, le="+Inf")))] = 1
+        samples["%s_sum%s" % (name, self.format_labels(labels))] = value
+        samples["%s_count%s" % (name, self.format_labels(labels))] = 1
+        self.add(samples)
+
+    def write_redis(self, pipeline, samples):
+        key = cache.make_key(self.hash_key)
+        for sample, value in samples.items():
+            pipeline.hincrbyfloat(key, sample, value)
+
+    def write_cache(self, samples):
+        totals = cache.get(self.hash_key) or {}
+        for sample, value in samples.items():
+            totals[sample] = totals.get(sample, 0) + value
+        cache.set(self.hash_key, totals, timeout=None)
+
+    def totals(self):
+        """Returns every sample of all workers, after flushing this process's buffer."""
+        self.flush()
+        try:
+            raw = get_redis_connection("default").hgetall(cache.make_key(self.hash_key))
+            return {sample.decode(): float(value) for sample, value in raw.items()}
+        except NotImplementedError:
+            return cache.get(self.hash_key) or {}
+
+    def reset(self):
+        self.clear()
+        cache.delete(self.hash_key)
+
+    @classmethod
+    def _family(cls, sample):
+        name = sample.split("{", 1)[0]
+        if name not in cls.definitions:
+            name = name.rsplit("_", 1)[0]
+        return name
+
+    @staticmethod
+    def _sort_key(sample):
+        # grouped by labels, buckets in increasing `le` order then _sum and _count.
+        name, _, labels = sample.partition("{")
+        labels = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', labels))
+        le = float(labels.pop("le", "inf"))
+        return sorted(labels.items()), not name.endswith("_bucket"), le, name
+
+    @staticmethod
+    def _format_value(value):
+        return repr(int(value)) if float(value).is_integer() else repr(value)
+
+    def render(self):
+        by_family = {}
+        for sample, value in self.totals().items():
+            by_family.setdefault(self._family(sample), []).append((sample, value))
+
+        lines = []
+        for family in sorted(by_family):
+            metric_type, help_text, _ = self.definitions.get(
+                family, ("untyped", "", None)
+            )
+            lines.append("# HELP %s %s" % (family, help_text))
+            lines.append("# TYPE %s %s" % (family, metric_type))
+            for sample, value in sorted(
+                by_family[family], key=lambda item: self._sort_key(item[0])
+            ):
+                lines.append("%s %s" % (sample, self._format_value(value)))
+        return "\n".join(lines) + "\n"
+
+
+class QueryRecorder(object):
+    """
+    Database execute wrapper counting the queries of a request and the time spent in them.
+
+    Example:
+    --------
+    ```python
+    recorder = QueryRecorder()
+    with connection.execute_wrapper(recorder):
+        ...
+    recorder.count, recorder.duration
+    ```
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+metrics = flush_at_exit(Metrics())
@@ -0,0 +1,252 @@
+import hashlib
+import math
+import threading
+import time
+from urllib.parse import urlencode
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from utility.circuit_breaker import CircuitOpenError
+from utility.retry_mechanism import RetryStrategy
+
+
+class MovieCatalog(object):
+    """
+    Read-through cache for the third-party movie catalog.
+
+    Successful upstream pages are stored in the default (redis) cache, keyed by the
+    query parameters of the request that the upstream api understands (`upstream_params`),
+    others are dropped so arbitrary query strings can't bypass the cache. A cached page is served as-is for
+    MOVIE_API_CACHE_TTL seconds. After that it is considered stale: it is still served
+    for up to MOVIE_API_CACHE_STALE_TTL more seconds while a single background thread
+    refreshes it, so callers never wait on the upstream api or its retry backoff unless
+    the page has never been fetched. Setting MOVIE_API_CACHE_TTL to 0 disables the cache.
+
+    Pages that have to be fetched in the request path are single-flighted across all
+    workers: the first caller takes a short lease in the cache and fetches, concurrent
+    callers for the same page wait up to MOVIE_API_COALESCE_WAIT seconds for its result
+    instead of sending their own request to the upstream api.
+
+    While the upstream circuit is open (see CircuitBreaker) cached pages keep being
+    served, and pages that were never cached get a degraded payload without waiting.
+
+    The upstream validators (ETag and Last-Modified headers) are cached with each page so
+    the view can hand them to its clients and answer their conditional requests.
+
+    Example:
+    --------
+    ```python
+    catalog = MovieCatalog(url, username=username, password=password, verify=False)
+    data = catalog.get({"page": 2})
+    ```
+
+    Methods:
+    --------
+    get(params=None):
+        Returns the catalog page for the given query parameters, from cache when possible.
+
+    get_page(params=None):
+        Same as get, returns a (data, validators) tuple.
+
+    load(params=None):
+        Fetches the page once for all concurrent callers and shares the result.
+
+    refresh(params=None):
+        Fetches the page from the upstream api and stores it in cache if successful.
+
+    open(params=None, stream=False, headers=None):
+        Sends the upstream request and returns the unread response, for pass-through.
+    """
+
+    key_prefix = "movie_catalog"
+    validator_headers = ("ETag", "Last-Modified")
+    upstream_params = ("page",)
+
+    def __init__(self, url, username=None, password=None, verify=None):
+        self.url = url
+        self.username = username
+        self.password = password
+        self.verify = verify
+
+    @classmethod
+    def clean_params(cls, params=None):
+        """Returns the query parameters forwarded to the upstream api."""
+        return {
+            name: value
+            for name, value in (params or {}).items()
+            if name in cls.upstream_params
+        }
+
+    @classmethod
+    def make_key(cls, params=None):
+        query = urlencode(sorted(cls.clean_params(params).items()), doseq=True)
+        return "%s:%s" % (cls.key_prefix, hashlib.md5(query.encode()).hexdigest())
+
+    @classmethod
+    def get_validators(cls, response):
+        """Returns the validator headers of an upstream response."""
+        return {
+            header: response.headers[header]
+            for header in cls.validator_headers
+            if response.headers.get(header)
+        }
+
+    def get(self, params=None):
+        return self.get_page(params)[0]
+
+    def get_page(self, params=None):
+        """
+        Returns:
+        --------
+        tuple: (data, validators) where validators holds the upstream ETag and
+        Last-Modified headers of the page, empty for a failure payload.
+        """
+        params = self.clean_params(params)
+        if not settings.MOVIE_API_CACHE_TTL:
+            return self.load(params)
+
+        entry = cache.get(self.make_key(params))
+        if entry is None:
+            return self.load(params)
+
+        if time.time() - entry["fetched_at"] > settings.MOVIE_API_CACHE_TTL:
+            self.schedule_refresh(params)
+        return entry["data"], entry.get("validators", {})
+
+    def fetch(self, params=None):
+        """
+        Fetches a page from the upstream api.
+
+        Returns:
+        --------
+        tuple: (is_success, data, validators) where data is the parsed page or the
+        failure payload.
+        """
+        is_success, response = self.open(params)
+        if not is_success:
+            return False, response, {}
+        return True, response.json(), self.get_validators(response)
+
+    def open(self, params=None, stream=False, headers=None):
+        """
+        Sends the upstream request without reading the body.
+
+        `headers` are sent along, e.g. the If-None-Match of the client, in which case an
+        HTTP 304 from the upstream api counts as a success too.
+
+        Returns:
+        --------
+        tuple: (is_success, response) where response is the `requests.Response` of a
+        successful (HTTP 200 or 304) request or the failure payload. A streamed response
+        must be closed by the caller once its body is consumed.
+        """
+        try:
+            response = RetryStrategy.fetch(
+                self.url,
+                params=self.clean_params(params),
+                username=self.username,
+                password=self.password,
+                verify=self.verify,
+                stream=stream,
+                headers=headers,
+            )
+        except CircuitOpenError as exc:
+            return False, RetryStrategy.degraded_response(exc.retry_after)
+        except requests.exceptions.RequestException:
+            return False, RetryStrategy.failure_response(503)
+
+        if response.status_code not in (200, 304):
+            response.close()
+            return False, RetryStrategy.failure_response(response.status_code)
+        return True, response
+
+    @staticmethod
+    def lease_timeout():
+        """
+        Seconds the coalescing lease is held, never shorter than the slowest possible fetch
+        so a second leader can't start while the first one is still retrying.
+        """
+        return max(
+            settings.MOVIE_API_COALESCE_LEASE, math.ceil(RetryStrategy.max_duration())
+        )
+
+    def load(self, params=None):
+        """
+        Fetches a page with request coalescing.
+
+        The caller that wins the lease fetches the page and publishes the outcome, success
+        or failure, for MOVIE_API_COALESCE_RESULT_TTL seconds. Everyone else polls for that
+        outcome. If the lease disappears without an outcome (the leader died) the waiter
+        fetches on its own; if the wait runs out a failure payload is returned rather than
+        adding another request to an already slow upstream.
+        """
+        key = self.make_key(params)
+        lease_key = "%s:inflight" % key
+        result_key = "%s:result" % key
+
+        if cache.add(lease_key, 1, timeout=self.lease_timeout()):
+            try:
+                page = self.refresh(params)
+                cache.set(
+                    result_key, page, timeout=settings.MOVIE_API_COALESCE_RESULT_TTL
+                )
+                return page
+            finally:
+                cache.delete(lease_key)
+
+        deadline = time.monotonic() + settings.MOVIE_API_COALESCE_WAIT
+        delay = 0.025
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
+
+            page = cache.get(result_key)
+            if page is not None:
+                return page
+            if not cache.get(lease_key):
+                # The leader released the lease, read its result one last time before
+                # assuming it died without publishing anything.
+                page = cache.get(result_key)
+                return page if page is not None else self.refresh(params)
+        return RetryStrategy.failure_response(503), {}
+
+    def refresh(self, params=None):
+        is_success, data, validators = self.fetch(params)
+        if is_success:
+            self.store(params, data, validators)
+        return data, validators
+
+    def store(self, params, data, validators=None):
+        if not settings.MOVIE_API_CACHE_TTL:
+            # the cache is disabled, its entries would never be read.
+            return
+        cache.set(
+            self.make_key(params),
+            {"data": data, "validators": validators or {}, "fetched_at": time.time()},
+            timeout=settings.MOVIE_API_CACHE_TTL + settings.MOVIE_API_CACHE_STALE_TTL,
+        )
+
+    def schedule_refresh(self, params=None):
+        """
+        Starts a background refresh of a stale page unless one is already running.
+
+        cache.add only succeeds for the first caller across all workers, the lock
+        expires on its own in case the refreshing process dies.
+
+        Returns:
+        --------
+        threading.Thread or None: The refresh thread, or None if another caller holds the lock.
+        """
+        lock_key = "%s:refreshing" % self.make_key(params)
+        if not cache.add(lock_key, 1, timeout=settings.MOVIE_API_CACHE_REFRESH_TIMEOUT):
+            return None
+
+        def run():
+            try:
+                self.refresh(params)
+            finally:
+                cache.delete(lock_key)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
@@ -1,14 +1,17 @@
+import heapq
 from itertools import chain
-from collections import Counter
-from itertools import islice
-from django.db.models import Prefetch
-from movies.models import Movies
+from collections import Counter, defaultdict
+from django.db.models import Count, Prefetch
+from movies.models import Genre, Movies, MovieGenre
 
 
 class TopFavouriteGenres(object):
     """
     Utility class for computing the top N favorite genres from movie collections.
 
+    A genre is counted once for every collection a movie carrying it is in, ties are
+    broken by genre name.
+
     Methods:
     - `top_n_genres(lst, n=3)`: Given a list of genres, returns a comma-separated string
       containing the top N genres based on frequency.
@@ -16,15 +19,29 @@ class TopFavouriteGenres(object):
     - `top_favourite_genres_from_user_collection(collections, n=3)`: Given a queryset of user's
       collections, retrieves the genres of associated movies and returns the top N favorite genres.
 
+    - `top_favourite_genres_from_database(collections, n=3)`: Same result, but the genres are
+      counted by the database (GROUP BY over the collection -> movie -> genre join) and only
+      one row per genre is loaded.
+
+    - `top_favourite_genres_for_users(user_ids, n=3)`: Top N favorite genres of many users
+      with a single aggregate query, for batch jobs. Returns a dict keyed by user id.
+
     """
 
     @staticmethod
     def top_n_genres(lst, n=3):
-        _dict = Counter(lst)
-        sorted_dict = dict(sorted(_dict.items(), key=lambda x: x[1], reverse=True))
-        genres = list(islice(sorted_dict.keys(), n))
+        # most_common keeps the n largest on a heap instead of sorting every genre.
+        genres = [genre for genre, _ in Counter(lst).most_common(n)]
         return ",".join(genres)
 
+    @staticmethod
+    def top_n_counted_genres(rows, n=3):
+        """
+        Given (genre, count) pairs, returns the comma-separated top N genres, ties by name.
+        """
+        top = heapq.nsmallest(n, rows, key=lambda row: (-row[1], row[0]))
+        return ",".join(genre for genre, _ in top)
+
     def top_favourite_genres_from_user_movie_collection(self, collections, n=3):
 
         user_collections = collections.prefetch_related(
@@ -34,17 +51,41 @@ class TopFavouriteGenres(object):
                 to_attr="movies_with_genres",
             )
         )
-        # Iterate through each collection of the user
-        genres_list = []
-        for collection in user_collections:
-            # append genres to a list
-            for movie in collection.movies_with_genres:
-                genres_list.append(
-                    movie.genres.split(",")
-                )  # movie.genres is a string, make it a list using split.
-        genres_list = list(chain(*genres_list))  # flatten the list
-        top_genres = self.top_n_genres(
-            genres_list, n
-        )  # this method return top n genres from the given genres list.
+        # Iterate through each collection of the user and count the genres of its movies,
+        # movie.genres is a string, make it a list of names.
+        genres = Counter(
+            chain.from_iterable(
+                Genre.split_names(movie.genres)
+                for collection in user_collections
+                for movie in collection.movies_with_genres
+            )
+        )
+        top_genres = self.top_n_counted_genres(
+            genres.items(), n
+        )  # keep the top n genres only, without sorting all of them.
 
         return top_genres
+
+    def top_favourite_genres_from_database(self, collections, n=3):
+        rows = (
+            MovieGenre.objects.filter(movie__collections__in=collections)
+            .values("genre__name")
+            .annotate(count=Count("id"))
+            .values_list("genre__name", "count")
+        )
+        return self.top_n_counted_genres(rows, n)
+
+    def top_favourite_genres_for_users(self, user_ids, n=3):
+        rows = (
+            MovieGenre.objects.filter(movie__collections__user_id__in=user_ids)
+            .values("movie__collections__user_id", "genre__name")
+            .annotate(count=Count("id"))
+            .values_list("movie__collections__user_id", "genre__name", "count")
+        )
+        genres_by_user = defaultdict(list)
+        for user_id, genre, count in rows.iterator():
+            genres_by_user[user_id].append((genre, count))
+        return {
+            user_id: self.top_n_counted_genres(genres_by_user.get(user_id, []), n)
+            for user_id in user_ids
+        }
@@ -0,0 +1,107 @@
+from collections import defaultdict
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from utility.buffered_writer import BufferedWriter, flush_at_exit
+
+
+class RequestCounter(BufferedWriter):
+    """
+    Per-process request counts, flushed to the default (redis) cache in batches.
+
+    Requests are counted in memory by route name and status class (`2xx`, `4xx`...). The
+    buffer is flushed every REQUEST_COUNTER_FLUSH_EVERY requests, or on the first request
+    after REQUEST_COUNTER_FLUSH_INTERVAL seconds, with a single redis pipeline: the total
+    goes to the `request_count` key and the breakdown to the `request_count:routes` hash.
+    With a cache backend other than django_redis the plain cache api is used instead, see
+    BufferedWriter.
+
+    Counts of other processes only show up once they flush, and a failed flush keeps the
+    counts in the buffer for the next one.
+
+    Example:
+    --------
+    ```python
+    request_counter.record("movies", 200)
+    request_counter.totals()
+    # {"requests": 1, "routes": {"movies": {"2xx": 1}}}
+    ```
+    """
+
+    name = "Request counts"
+    flush_every_setting = "REQUEST_COUNTER_FLUSH_EVERY"
+    flush_interval_setting = "REQUEST_COUNTER_FLUSH_INTERVAL"
+    total_key = "request_count"
+    routes_key = "request_count:routes"
+
+    @staticmethod
+    def make_field(route, status_code):
+        return "%s|%dxx" % (route, status_code // 100)
+
+    def record(self, route, status_code):
+        self.add({self.make_field(route, status_code): 1})
+
+    def write_redis(self, pipeline, counts):
+        # INCRBY on a missing key starts from 0, so the counter survives a flush of redis.
+        pipeline.incrby(cache.make_key(self.total_key), sum(counts.values()))
+        routes_key = cache.make_key(self.routes_key)
+        for field, count in counts.items():
+            pipeline.hincrby(routes_key, field, count)
+
+    def write_cache(self, counts):
+        self._incr(self.total_key, sum(counts.values()))
+        fields = cache.get(self.routes_key) or []
+        new_fields = [field for field in counts if field not in fields]
+        if new_fields:
+            cache.set(self.routes_key, fields + new_fields, timeout=None)
+        for field, count in counts.items():
+            self._incr("%s:%s" % (self.routes_key, field), count)
+
+    @staticmethod
+    def _incr(key, delta):
+        cache.add(key, 0, timeout=None)
+        cache.incr(key, delta)
+
+    def _read_routes(self):
+        try:
+            raw = get_redis_connection("default").hgetall(
+                cache.make_key(self.routes_key)
+            )
+            return {field.decode(): int(count) for field, count in raw.items()}
+        except NotImplementedError:
+            fields = cache.get(self.routes_key) or []
+            counts = cache.get_many(["%s:%s" % (self.routes_key, f) for f in fields])
+            return {
+                field: counts.get("%s:%s" % (self.routes_key, field), 0)
+                for field in fields
+            }
+
+    def totals(self):
+        """
+        Returns the aggregated counts, after flushing this process's buffer.
+
+        Returns:
+        --------
+        dict: {"requests": <total>, "routes": {<route>: {<status class>: <count>}}}
+        """
+        self.flush()
+        routes = defaultdict(dict)
+        for field, count in self._read_routes().items():
+            route, status_class = field.rsplit("|", 1)
+            routes[route][status_class] = count
+        return {"requests": cache.get(self.total_key) or 0, "routes": dict(routes)}
+
+    def reset(self):
+        self.clear()
+        try:
+            get_redis_connection("default").delete(
+                cache.make_key(self.total_key), cache.make_key(self.routes_key)
+            )
+        except NotImplementedError:
+            fields = cache.get(self.routes_key) or []
+            cache.delete_many(
+                [self.total_key, self.routes_key]
+                + ["%s:%s" % (self.routes_key, field) for field in fields]
+            )
+
+
+request_counter = flush_at_exit(RequestCounter())
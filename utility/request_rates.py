@@ -0,0 +1,159 @@
+import time
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from utility.buffered_writer import BufferedWriter, flush_at_exit
+
+
+class RequestRates(BufferedWriter):
+    """
+    Sliding-window request rates and distinct active users, on rotating redis buckets.
+
+    Every request is counted in the bucket of its second and of its minute, and its user
+    is added to a HyperLogLog of that second and minute: constant work per request. The
+    buckets expire on their own, a second bucket after SECOND_BUCKET_TTL seconds and a
+    minute bucket after MINUTE_BUCKET_TTL seconds, so nothing has to be reset or cleaned.
+
+    Requests are buffered in the process and flushed with one redis pipeline whenever a
+    new second starts, so at most once per second per process (see BufferedWriter). With
+    a cache backend other than django_redis, counts use the plain cache api and users are
+    kept as exact sets.
+
+    Windows are made of complete buckets only:
+    - second: the last complete second.
+    - minute: the last 60 complete seconds.
+    - hour: the last 60 complete minutes.
+
+    Example:
+    --------
+    ```python
+    request_rates.record(request.user.id)
+    request_rates.windows()
+    # {"second": {"requests": 12, "per_second": 12.0, "users": 9}, "minute": ..., "hour": ...}
+    ```
+    """
+
+    name = "Request rates"
+    key_prefix = "rates"
+    SECOND_BUCKET_TTL = 120
+    MINUTE_BUCKET_TTL = 2 * 60 * 60
+    # window name: (bucket unit, number of buckets, window length in seconds)
+    windows_spec = {
+        "second": ("s", 1, 1),
+        "minute": ("s", 60, 60),
+        "hour": ("m", 60, 60 * 60),
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.second = None
+
+    @staticmethod
+    def new_buffer():
+        # second: [requests, user ids]
+        return {}
+
+    @staticmethod
+    def merge(buffer, items):
+        for second, (count, user_ids) in items.items():
+            entry = buffer.setdefault(second, [0, set()])
+            entry[0] += count
+            entry[1] |= user_ids
+
+    def is_due(self, items):
+        second = next(iter(items))
+        rotated = self.second is not None and second != self.second
+        self.second = second
+        return rotated
+
+    def _key(self, kind, unit, bucket):
+        return "%s:%s:%s:%s" % (self.key_prefix, kind, unit, bucket)
+
+    def record(self, user_id=None, now=None):
+        second = int(now if now is not None else time.time())
+        self.add({second: (1, {user_id} if user_id is not None else set())})
+
+    def _buckets(self, second):
+        return (
+            ("s", second, self.SECOND_BUCKET_TTL),
+            ("m", second // 60, self.MINUTE_BUCKET_TTL),
+        )
+
+    def write_redis(self, pipeline, buffer):
+        for second, (count, user_ids) in buffer.items():
+            for unit, bucket, ttl in self._buckets(second):
+                key = cache.make_key(self._key("requests", unit, bucket))
+                pipeline.incrby(key, count)
+                pipeline.expire(key, ttl)
+                if user_ids:
+                    key = cache.make_key(self._key("users", unit, bucket))
+                    pipeline.pfadd(key, *user_ids)
+                    pipeline.expire(key, ttl)
+
+    def write_cache(self, buffer):
+        for second, (count, user_ids) in buffer.items():
+            for unit, bucket, ttl in self._buckets(second):
+                key = self._key("requests", unit, bucket)
+                cache.add(key, 0, timeout=ttl)
+                cache.incr(key, count)
+                if user_ids:
+                    key = self._key("users", unit, bucket)
+                    cache.set(key, (cache.get(key) or set()) | user_ids, timeout=ttl)
+
+    def _read_redis(self, windows):
+        connection = get_redis_connection("default")
+        pipeline = connection.pipeline(transaction=False)
+        for requests_keys, users_keys in windows.values():
+            pipeline.mget([cache.make_key(key) for key in requests_keys])
+            pipeline.pfcount(*[cache.make_key(key) for key in users_keys])
+        results = iter(pipeline.execute())
+        return {
+            name: (sum(int(count or 0) for count in next(results)), next(results))
+            for name in windows
+        }
+
+    @staticmethod
+    def _read_cache(windows):
+        totals = {}
+        for name, (requests_keys, users_keys) in windows.items():
+            counts = cache.get_many(requests_keys)
+            users = set().union(*cache.get_many(users_keys).values())
+            totals[name] = (sum(counts.values()), len(users))
+        return totals
+
+    def windows(self, now=None):
+        """
+        Returns the requests, requests per second and distinct users of each window, after
+        flushing this process's buffer.
+        """
+        self.flush()
+        second = int(now if now is not None else time.time())
+        windows = {}
+        for name, (unit, size, _) in self.windows_spec.items():
+            last = second - 1 if unit == "s" else second // 60 - 1
+            buckets = range(last - size + 1, last + 1)
+            windows[name] = (
+                [self._key("requests", unit, bucket) for bucket in buckets],
+                [self._key("users", unit, bucket) for bucket in buckets],
+            )
+
+        try:
+            totals = self._read_redis(windows)
+        except NotImplementedError:
+            totals = self._read_cache(windows)
+        return {
+            name: {
+                "requests": requests,
+                "per_second": round(requests / self.windows_spec[name][2], 3),
+                "users": users,
+            }
+            for name, (requests, users) in totals.items()
+        }
+
+    def clear(self):
+        """Drops the buffer of this process, the buckets expire on their own."""
+        super().clear()
+        with self.lock:
+            self.second = None
+
+
+request_rates = flush_at_exit(RequestRates())
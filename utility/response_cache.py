@@ -0,0 +1,138 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from movies.models import Collection
+
+
+class ResponseCache(object):
+    """
+    Cache of rendered response data for the collection endpoints, in the default (redis) cache.
+
+    Entries are grouped in scopes, `user:<id>` for the collection list of a user and
+    `collection:<uuid>` for one collection. Every scope has a version number that is
+    part of the keys of its entries; writes bump the version (from the signal handlers
+    in movies.signals) so all entries of the scope become unreachable at once, without
+    scanning for keys. Stale entries simply expire after RESPONSE_CACHE_TTL seconds.
+
+    Hits and misses are counted and served next to the request count.
+
+    Example:
+    --------
+    ```python
+    data = ResponseCache.get("user:%s" % request.user.id, request)
+    if data is None:
+        data = ...
+        ResponseCache.set("user:%s" % request.user.id, request, data)
+    ```
+    """
+
+    key_prefix = "response"
+    hits_key = "response_cache_hits"
+    misses_key = "response_cache_misses"
+
+    @staticmethod
+    def user_scope(user_id):
+        return "user:%s" % user_id
+
+    @staticmethod
+    def collection_scope(collection_uuid):
+        return "collection:%s" % collection_uuid
+
+    @classmethod
+    def _version_key(cls, scope):
+        return "%s:version:%s" % (cls.key_prefix, scope)
+
+    @classmethod
+    def get_version(cls, scope):
+        key = cls._version_key(scope)
+        version = cache.get(key)
+        if version is None:
+            # start from the clock so a version lost to an eviction is never reused.
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        return version
+
+    @classmethod
+    def make_key(cls, scope, request):
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        return "%s:%s:%s:%s:%s" % (
+            cls.key_prefix,
+            scope,
+            cls.get_version(scope),
+            request.user.id,
+            url,
+        )
+
+    @classmethod
+    def get(cls, scope, request):
+        data = cache.get(cls.make_key(scope, request))
+        cls._count(cls.misses_key if data is None else cls.hits_key)
+        return data
+
+    @classmethod
+    def set(cls, scope, request, data):
+        cache.set(
+            cls.make_key(scope, request), data, timeout=settings.RESPONSE_CACHE_TTL
+        )
+
+    @staticmethod
+    def _count(key):
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+    @classmethod
+    def stats(cls):
+        counts = cache.get_many([cls.hits_key, cls.misses_key])
+        return {
+            "hits": counts.get(cls.hits_key, 0),
+            "misses": counts.get(cls.misses_key, 0),
+        }
+
+    @classmethod
+    def reset_stats(cls):
+        cache.set_many({cls.hits_key: 0, cls.misses_key: 0}, timeout=None)
+
+    @classmethod
+    def invalidate(cls, scopes):
+        """
+        Bumps the version of the given scopes.
+
+        Inside a transaction the versions are bumped again on commit, so a response
+        computed from the old rows while the transaction was running is not kept.
+        """
+        scopes = set(scopes)
+
+        def bump():
+            for scope in scopes:
+                key = cls._version_key(scope)
+                try:
+                    cache.incr(key)
+                except ValueError:
+                    cache.set(key, time.time_ns(), timeout=None)
+
+        bump()
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(bump)
+
+    @classmethod
+    def invalidate_collections(cls, collections):
+        """Invalidates (uuid, user id) pairs of collections."""
+        scopes = set()
+        for collection_uuid, user_id in collections:
+            scopes.add(cls.collection_scope(collection_uuid))
+            scopes.add(cls.user_scope(user_id))
+        cls.invalidate(scopes)
+
+    @classmethod
+    def invalidate_movies(cls, movie_ids):
+        """Invalidates every collection containing one of the movies, and its owner."""
+        movie_ids = list(movie_ids)
+        if not movie_ids:
+            return
+        cls.invalidate_collections(
+            Collection.objects.filter(movies__id__in=movie_ids)
+            .values_list("uuid", "user_id")
+            .distinct()
+        )
@@ -1,22 +1,39 @@
+import threading
+import time
+from urllib.parse import urlparse
 import requests
+from django.conf import settings
 from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError
 from urllib3.util import Retry
+from utility.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utility.metrics import metrics
 
 
 class RetryStrategy(object):
     """
         A class providing a retry mechanism for making HTTP requests with exponential backoff.
 
+        All requests go through a single process-wide `requests.Session` whose adapters
+        (mounted for both `http://` and `https://`) hold a bounded, keep-alive connection
+        pool. The session is created lazily on first use and is shared by every worker
+        thread, so TCP and TLS handshakes are paid once per pooled connection instead of
+        once per request.
+
+        When MOVIE_API_BREAKER_ENABLED is set, every host is guarded by a shared
+        CircuitBreaker. While its circuit is open requests fail fast with
+        CircuitOpenError (or a degraded payload from `retry_mechanism`) instead of
+        going through the retry backoff.
+
         Usage:
         ------
-        To use the retry mechanism, create an instance of this class and call the
-        `retry_mechanism` method with the desired parameters.
+        To use the retry mechanism, call the `retry_mechanism` method with the desired
+        parameters.
 
         Example:
         --------
         ```python
-        retry_strategy = RetryStrategy()
-        response_data = retry_strategy.retry_mechanism(
+        response_data = RetryStrategy.retry_mechanism(
             url='https://example.com/api/data',
             username='your_username',
             password='your_password',
@@ -26,18 +43,197 @@ class RetryStrategy(object):
 
         Attributes:
         -----------
-        None
+        _session (requests.Session): The shared session, created by `get_session`.
+        _session_lock (threading.Lock): Guards the lazy creation of the shared session.
 
         Methods:
         --------
-        retry_mechanism(url, username=None, password=None, verify=None):
+        get_session():
+            Returns the shared, pooled session, creating it on first use.
+
+        max_duration():
+            Returns the worst case duration of a fetch, retries included.
+
+        get_breaker(url):
+            Returns the circuit breaker guarding the host of the url, or None if disabled.
+
+        fetch(url, params=None, username=None, password=None, verify=None, timeout=None, stream=False):
+            Performs an HTTP GET request through the shared session and returns the raw response.
+            Its latency, outcome and retries are recorded in utility.metrics.
+
+        retry_mechanism(url, params=None, username=None, password=None, verify=None, timeout=None):
             Performs an HTTP GET request to the specified URL with retry logic based on
             predefined retry strategy parameters.
 
         """
 
+    _session = None
+    _session_lock = threading.Lock()
+
+    @staticmethod
+    def build_session():
+        """
+                Builds a session with the retry strategy and a bounded connection pool
+                mounted for both http and https.
+                """
+
+        #  Define retry strategy
+        retry_strategy = Retry(
+            total=settings.MOVIE_API_RETRY_TOTAL,  # Maximum number of retries
+            backoff_factor=settings.MOVIE_API_RETRY_BACKOFF,  # Exponential backoff factor
+            status_forcelist=[429, 500, 502, 503, 504],  # HTTP status codes to retry on
+        )
+
+        # Create an HTTP adapter with the retry strategy and a bounded connection pool.
+        # The pool doesn't block: past pool_maxsize (e.g. while streamed responses hold
+        # connections) an extra connection is opened and discarded after use, waiting
+        # for a free one would have no timeout.
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=settings.MOVIE_API_POOL_CONNECTIONS,
+            pool_maxsize=settings.MOVIE_API_POOL_MAXSIZE,
+        )
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @classmethod
+    def get_session(cls):
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    cls._session = cls.build_session()
+        return cls._session
+
+    @classmethod
+    def close_session(cls):
+        with cls._session_lock:
+            if cls._session is not None:
+                cls._session.close()
+                cls._session = None
+
+    @staticmethod
+    def max_duration():
+        """
+        Returns the longest a `fetch` can take, in seconds: every attempt running into its
+        connect and read timeouts, plus the backoff between them (Retry-After aside).
+        """
+        attempts = settings.MOVIE_API_RETRY_TOTAL + 1
+        timeout = settings.MOVIE_API_CONNECT_TIMEOUT + settings.MOVIE_API_READ_TIMEOUT
+        # urllib3 sleeps backoff_factor * 2 ** (errors - 1) after the second error onwards.
+        factor = settings.MOVIE_API_RETRY_BACKOFF
+        backoff = sum(
+            min(Retry.DEFAULT_BACKOFF_MAX, factor * 2 ** (n - 1))
+            for n in range(2, attempts)
+        )
+        return attempts * timeout + backoff
+
     @staticmethod
-    def retry_mechanism(url, username=None, password=None, verify=None):
+    def get_breaker(url):
+        if not settings.MOVIE_API_BREAKER_ENABLED:
+            return None
+        return CircuitBreaker(urlparse(url).netloc)
+
+    @classmethod
+    def fetch(
+        cls,
+        url,
+        params=None,
+        username=None,
+        password=None,
+        verify=None,
+        timeout=None,
+        stream=False,
+        headers=None,
+    ):
+        """
+                Performs an HTTP GET request through the shared session.
+
+                Auth and timeouts are passed per request so the shared session itself is
+                never mutated, which keeps it safe to use from several threads. With
+                `stream` set only the status line and headers are read, the body is left
+                on the pooled connection until the caller consumes or closes the response.
+                `headers` are added to the request, e.g. conditional request headers.
+
+                Returns:
+                --------
+                requests.Response: The raw upstream response.
+
+                Raises:
+                -------
+                requests.exceptions.RequestException: If the request fails after all retries.
+                CircuitOpenError: If the circuit for the host is open.
+                """
+
+        host = urlparse(url).netloc
+        breaker = cls.get_breaker(url)
+        if breaker is not None and not breaker.allow_request():
+            metrics.inc("upstream_requests_total", host=host, outcome="circuit_open")
+            raise CircuitOpenError(breaker.name, breaker.retry_after())
+
+        if timeout is None:
+            timeout = (
+                settings.MOVIE_API_CONNECT_TIMEOUT,
+                settings.MOVIE_API_READ_TIMEOUT,
+            )
+        start = time.perf_counter()
+        try:
+            response = cls.get_session().get(
+                url,
+                params=params,
+                auth=(username, password),
+                verify=verify,
+                timeout=timeout,
+                stream=stream,
+                headers=headers,
+            )
+        except requests.exceptions.RequestException as exc:
+            cls.record_call(host, start, "error", cls.count_retries(exc=exc))
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+
+        failed = response.status_code >= 500 or response.status_code == 429
+        cls.record_call(
+            host,
+            start,
+            "failure" if failed else "success",
+            cls.count_retries(response=response),
+        )
+        if breaker is not None:
+            if failed:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return response
+
+    @staticmethod
+    def count_retries(response=None, exc=None):
+        """Returns the number of retries the session made for a response or an error."""
+        if exc is not None:
+            # the retries were exhausted, their history is not kept on the error.
+            reason = exc.args[0] if exc.args else None
+            if isinstance(reason, MaxRetryError):
+                return settings.MOVIE_API_RETRY_TOTAL
+            return 0
+        retries = getattr(getattr(response, "raw", None), "retries", None)
+        return len(retries.history) if isinstance(retries, Retry) else 0
+
+    @staticmethod
+    def record_call(host, start, outcome, retries):
+        metrics.observe(
+            "upstream_request_duration_seconds", time.perf_counter() - start, host=host
+        )
+        metrics.inc("upstream_requests_total", host=host, outcome=outcome)
+        if retries:
+            metrics.inc("upstream_retries_total", retries, host=host)
+
+    @classmethod
+    def retry_mechanism(
+        cls, url, params=None, username=None, password=None, verify=None, timeout=None
+    ):
 
         """
                 Performs an HTTP GET request to the specified URL with retry logic based on
@@ -46,9 +242,12 @@ class RetryStrategy(object):
                 Parameters:
                 -----------
                 url (str): The URL to make the HTTP request to.
+                params (dict, optional): Query parameters forwarded to the URL.
                 username (str, optional): The username for authentication.
                 password (str, optional): The password for authentication.
                 verify (str, optional): Path to the CA certificate file for SSL verification.
+                timeout (tuple, optional): (connect, read) timeouts in seconds. Defaults to
+                    MOVIE_API_CONNECT_TIMEOUT and MOVIE_API_READ_TIMEOUT from settings.
 
                 Returns:
                 --------
@@ -57,28 +256,38 @@ class RetryStrategy(object):
 
                 """
 
-        #  Define retry strategy
-        retry_strategy = Retry(
-            total=4,  # Maximum number of retries
-            backoff_factor=2,  # Exponential backoff factor
-            status_forcelist=[429, 500, 502, 503, 504],  # HTTP status codes to retry on
-        )
-
-        # Create an HTTP adapter with the retry strategy and mount it to session
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-
-        # Create a new session object
-        session = requests.Session()
-        session.mount("http://", adapter)
-
-        # Make a request using the session object
-        response = session.get(url, auth=(username, password), verify=verify)
+        try:
+            response = cls.fetch(
+                url,
+                params=params,
+                username=username,
+                password=password,
+                verify=verify,
+                timeout=timeout,
+            )
+        except CircuitOpenError as exc:
+            return cls.degraded_response(exc.retry_after)
+        except requests.exceptions.RequestException:
+            return cls.failure_response(503)
 
         if response.status_code == 200:
             data = response.json()
         else:
-            data = {
-                "message": "Failed to load movies, please try again.",
-                "status_code": response.status_code,
-            }
+            data = cls.failure_response(response.status_code)
         return data
+
+    @staticmethod
+    def failure_response(status_code):
+        return {
+            "message": "Failed to load movies, please try again.",
+            "status_code": status_code,
+        }
+
+    @staticmethod
+    def degraded_response(retry_after):
+        return {
+            "message": "Movie service is temporarily unavailable, please try again later.",
+            "status_code": 503,
+            "degraded": True,
+            "retry_after": retry_after,
+        }
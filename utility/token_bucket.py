@@ -0,0 +1,112 @@
+import threading
+import time
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+# KEYS[1]: bucket hash, ARGV: refill rate (tokens per second), capacity, tokens requested.
+# Refills the bucket for the time elapsed since its last use and takes the tokens if there
+# are enough, atomically. Time comes from the redis server so workers with skewed clocks
+# share one view of the bucket. Returns {allowed, seconds until enough tokens}.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+
+local allowed = 0
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+else
+    wait = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(wait)}
+"""
+
+
+class TokenBucket(object):
+    """
+    Token bucket shared by every worker, in the default (redis) cache.
+
+    The bucket holds up to `capacity` tokens and is refilled at `rate` tokens per second;
+    a request takes a token or is refused with the number of seconds until one is
+    available. With django_redis the bucket is updated by a Lua script, atomically. Other
+    cache backends get a python implementation on the plain cache api, which is only
+    atomic within one process.
+
+    Example:
+    --------
+    ```python
+    allowed, wait = TokenBucket("movies:user:42", rate=1, capacity=10).consume()
+    ```
+    """
+
+    key_prefix = "token_bucket"
+    _script = None
+    _script_lock = threading.Lock()
+    _local_lock = threading.Lock()
+
+    def __init__(self, name, rate, capacity):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+
+    @property
+    def key(self):
+        return "%s:%s" % (self.key_prefix, self.name)
+
+    @classmethod
+    def get_script(cls, connection):
+        # register_script keeps the sha, the script body is only sent again after a
+        # NOSCRIPT error (e.g. redis restarted). It is run on the connection passed to
+        # consume, not the one it was registered with.
+        if cls._script is None:
+            with cls._script_lock:
+                if cls._script is None:
+                    cls._script = connection.register_script(TOKEN_BUCKET_SCRIPT)
+        return cls._script
+
+    def consume(self, tokens=1):
+        """
+        Returns:
+        --------
+        tuple: (allowed, wait) where wait is the number of seconds until `tokens` tokens
+        are available, 0 when allowed.
+        """
+        try:
+            connection = get_redis_connection("default")
+        except NotImplementedError:
+            return self._consume_locally(tokens)
+        allowed, wait = self.get_script(connection)(
+            keys=[cache.make_key(self.key)],
+            args=[self.rate, self.capacity, tokens],
+            client=connection,
+        )
+        return bool(int(allowed)), float(wait)
+
+    def _consume_locally(self, tokens):
+        with self._local_lock:
+            now = time.time()
+            state = cache.get(self.key) or {"tokens": self.capacity, "updated_at": now}
+            available = min(
+                self.capacity,
+                state["tokens"] + max(0, now - state["updated_at"]) * self.rate,
+            )
+            allowed = available >= tokens
+            if allowed:
+                available -= tokens
+            cache.set(
+                self.key,
+                {"tokens": available, "updated_at": now},
+                timeout=int(self.capacity / self.rate) + 1,
+            )
+        return allowed, 0 if allowed else (tokens - available) / self.rate
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+
+class UserCache(object):
+    """
+    Short-lived cache of users in the default (redis) cache, for token authentication.
+
+    The concrete fields of a user, except its password hash, are kept for
+    AUTH_USER_CACHE_TTL seconds and turned back into a `User` instance without a query.
+    Entries are dropped when the user is saved or deleted (see movies.signals), the TTL
+    only bounds staleness after writes that send no signal, e.g. queryset updates.
+
+    Example:
+    --------
+    ```python
+    user = UserCache.get(user_id)  # None if the user does not exist
+    ```
+    """
+
+    key_prefix = "auth_user"
+    excluded_fields = {"password"}
+
+    @classmethod
+    def make_key(cls, user_id):
+        return "%s:%s" % (cls.key_prefix, user_id)
+
+    @classmethod
+    def get_field_names(cls):
+        return [
+            field.attname
+            for field in get_user_model()._meta.concrete_fields
+            if field.name not in cls.excluded_fields
+        ]
+
+    @classmethod
+    def get(cls, user_id):
+        user_model = get_user_model()
+        field_names = cls.get_field_names()
+        key = cls.make_key(user_id)
+        values = cache.get(key)
+        if values is None:
+            values = (
+                user_model._default_manager.filter(pk=user_id)
+                .values_list(*field_names)
+                .first()
+            )
+            if values is None:
+                return None
+            cache.set(key, values, timeout=settings.AUTH_USER_CACHE_TTL)
+        # the password is left deferred, it is loaded if something reads it.
+        return user_model.from_db("default", field_names, values)
+
+    @classmethod
+    def invalidate(cls, user_id):
+        cache.delete(cls.make_key(user_id))